@@ -0,0 +1 @@
+# smbengine - shared game logic for the Mario-style scripts in this repo
@@ -0,0 +1,138 @@
+# Active-region scheduling for coins and Goombas.
+#
+# Only entities near the camera are simulated. The active region is the
+# screen plus a margin on each side; entities outside it are taken out of
+# their store and spatial hash and parked in a SleepPool, binned by x, so a
+# sleeping entity costs nothing per tick. When the region reaches one again
+# it is put back: resumed with the state it fell asleep with, or, for
+# entities spawned far from the camera, placed fresh from its spawn point.
+
+import struct
+from array import array
+from itertools import chain
+
+BIN_WIDTH = 256
+
+PACKED = "<II"  # bins, sleeping entities; see SleepPool.pack
+
+
+class SleepPool:
+    def __init__(self, store, grid):
+        self.store = store
+        self.grid = grid
+        self.bins = {}  # x // BIN_WIDTH -> [column values in store order]
+        self.x_column = store.names.index("x")
+        self.width = store.handle_cls.width
+        self.version = 0     # bumped whenever the sleeping set changes
+        self.packed = None   # (version, bytes) from the last pack or load
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.bins.values())
+
+    def clear(self):
+        self.bins.clear()
+        self.version += 1
+
+    def park(self, values):
+        x = values[self.x_column]
+        self.bins.setdefault(int(x // BIN_WIDTH), []).append(values)
+        self.version += 1
+
+    def park_new(self, **values):
+        # An entity that has not been spawned yet, as store.spawn takes it
+        store = self.store
+        self.park(tuple(values.get(name, default) for name, default in zip(store.names, store.defaults)))
+
+    def sleep(self, entity):
+        self.park(self.store.values(entity))
+        self.grid.remove(entity)
+        self.store.remove(entity)
+
+    def sleep_outside(self, left, right):
+        width = self.width
+        for entity in self.store:
+            x = entity.x
+            if x + width < left or x > right:
+                self.sleep(entity)
+
+    def wake(self, left, right):
+        # Bring back everything inside [left, right]; only the bins under
+        # the region are looked at
+        bins = self.bins
+        if not bins:
+            return
+        x_column = self.x_column
+        width = self.width
+        for index in range(int((left - width) // BIN_WIDTH), int(right // BIN_WIDTH) + 1):
+            entries = bins.get(index)
+            if entries is None:
+                continue
+            asleep = []
+            for values in entries:
+                x = values[x_column]
+                if x + width < left or x > right:
+                    asleep.append(values)
+                else:
+                    entity = self.store.spawn_values(values)
+                    self.grid.insert(entity, entity.x, entity.y, entity.width, entity.height)
+            if len(asleep) == len(entries):
+                continue
+            self.version += 1
+            if asleep:
+                bins[index] = asleep
+            else:
+                del bins[index]
+
+    def wake_all(self):
+        if self.bins:
+            self.wake(min(self.bins) * BIN_WIDTH, (max(self.bins) + 1) * BIN_WIDTH)
+
+    def discard_before(self, edge):
+        # Forget sleeping entities entirely left of edge
+        last = int(edge // BIN_WIDTH)
+        width = self.width
+        x_column = self.x_column
+        for index in [index for index in self.bins if index <= last]:
+            kept = [values for values in self.bins[index] if values[x_column] + width > edge]
+            self.version += 1
+            if kept:
+                self.bins[index] = kept
+            else:
+                del self.bins[index]
+
+    def pack(self):
+        # The sleeping entities as bytes for snapshots: the PACKED counts,
+        # (bin, count) pairs, then every row flat (the stores keep all their
+        # columns in one typecode). Packing is cached until the set changes,
+        # since most ticks leave it alone
+        if self.packed is None or self.packed[0] != self.version:
+            bins = self.bins
+            table = array("q", chain.from_iterable((index, len(rows)) for index, rows in bins.items()))
+            rows = array(self.store.arrays[0].typecode, chain.from_iterable(chain.from_iterable(bins.values())))
+            data = struct.pack(PACKED, len(bins), len(rows) // len(self.store.arrays)) + table.tobytes() + rows.tobytes()
+            self.packed = (self.version, data)
+        return self.packed[1]
+
+    def load(self, view, offset=0):
+        # Replace the sleeping set with one from pack(); returns the offset
+        # just past it
+        bin_count, count = struct.unpack_from(PACKED, view, offset)
+        width = len(self.store.arrays)
+        itemsize = self.store.arrays[0].itemsize
+        end = offset + struct.calcsize(PACKED) + 16 * bin_count + count * width * itemsize
+        data = view[offset:end]
+        if self.packed is not None and self.packed[0] == self.version and self.packed[1] == data:
+            return end  # already asleep exactly like this
+
+        table = array("q")
+        table.frombytes(data[struct.calcsize(PACKED):struct.calcsize(PACKED) + 16 * bin_count])
+        values = array(self.store.arrays[0].typecode)
+        values.frombytes(data[struct.calcsize(PACKED) + 16 * bin_count:])
+        rows = list(zip(*[iter(values)] * width))
+        self.clear()
+        start = 0
+        for index, length in zip(table[0::2], table[1::2]):
+            self.bins[index] = rows[start:start + length]
+            start += length
+        self.packed = (self.version, bytes(data))
+        return end
@@ -0,0 +1,164 @@
+# NumPy batch updates for coins and Goombas.
+#
+# The per-object updates cost one Python call per entity per tick. These do
+# the same work for a whole EntityStore in a handful of array operations on
+# zero-copy views of its columns, and give exactly the same results. NumPy is
+# optional: without it available() is False and the simulation keeps using
+# the per-object path.
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from smbengine.constants import SCREEN_HEIGHT
+
+# Width of the vertical strips used to find candidate platforms; at least a
+# Goomba wide, so one Goomba spans at most two strips
+COLUMN_WIDTH = 128
+
+
+def available():
+    return np is not None
+
+
+def column_view(store, name):
+    # Writable float64 view of a store column. The store cannot grow or
+    # shrink while a view is alive, so views must not outlive the call
+    return np.frombuffer(store.column(name), dtype=np.float64)
+
+
+class PlatformColumns:
+    # Terrain platforms as edge arrays plus, for each COLUMN_WIDTH strip, a
+    # padded row of the platforms crossing it. The pad index points at an
+    # extra platform that can never touch anything.
+    def __init__(self, platforms):
+        rects = [platform.rect for platform in platforms]
+        pad = len(rects)
+        self.left = np.array([r.left for r in rects] + [np.inf])
+        self.right = np.array([r.right for r in rects] + [-np.inf])
+        self.top = np.array([r.top for r in rects] + [np.inf])
+        self.bottom = np.array([r.bottom for r in rects] + [-np.inf])
+        
+        self.origin = min((r.left for r in rects), default=0)
+        end = max((r.right for r in rects), default=0)
+        count = max(1, -(-(end - self.origin) // COLUMN_WIDTH))
+        columns = [[] for _ in range(count)]
+        for index, rect in enumerate(rects):
+            first = (rect.left - self.origin) // COLUMN_WIDTH
+            last = (rect.right - 1 - self.origin) // COLUMN_WIDTH
+            for column in range(first, last + 1):
+                columns[column].append(index)
+        depth = max(1, max(len(c) for c in columns))
+        self.table = np.full((count, depth), pad, dtype=np.int64)
+        for column, indices in enumerate(columns):
+            self.table[column, :len(indices)] = indices
+        self.pad = pad
+
+    def candidates(self, left, right):
+        # Platform indices that may cross [left, right) for each row, each
+        # platform listed once
+        last_column = len(self.table) - 1
+        first = np.clip((left - self.origin) // COLUMN_WIDTH, 0, last_column).astype(np.int64)
+        second = np.clip((right - 1 - self.origin) // COLUMN_WIDTH, 0, last_column).astype(np.int64)
+        near = self.table[first]
+        far = self.table[second]
+        
+        # Platforms reaching back into the first strip are already in it
+        start = (second * COLUMN_WIDTH + self.origin)[:, None]
+        far = np.where((second == first)[:, None] | (self.left[far] < start), self.pad, far)
+        return np.concatenate((near, far), axis=1)
+
+
+def platform_columns(terrain):
+    columns = getattr(terrain, "batch_columns", None)
+    if columns is None:
+        columns = terrain.batch_columns = PlatformColumns(terrain.platforms)
+    return columns
+
+
+def update_coins(coins, dt=1.0):
+    # Coin.update for every live coin
+    if len(coins):
+        column_view(coins, "rotation")[:] += 0.2 * dt  # Animation speed
+
+
+def coin_widths(coins):
+    # Spinning coin widths, int(width * abs(sin(rotation))) as in Coin.draw
+    if not len(coins):
+        return np.zeros(0, dtype=np.int64)
+    return (coins.handle_cls.width * np.abs(np.sin(column_view(coins, "rotation")))).astype(np.int64)
+
+
+def update_goombas(goombas, terrain, goomba_hash=None, dt=1.0):
+    # Goomba.update for every live Goomba, then moves the ones whose
+    # broadphase cells changed. Both moves are the swept tests of
+    # collide.move along one axis; a step has to stay under
+    # COLUMN_WIDTH - width - 2 pixels, far beyond any sensible tick rate
+    count = len(goombas)
+    if not count:
+        return
+    width = goombas.handle_cls.width
+    height = goombas.handle_cls.height
+    x = column_view(goombas, "x")
+    y = column_view(goombas, "y")
+    vel_x = column_view(goombas, "vel_x")
+    old_x = x.copy()
+    old_y = y.copy()
+    columns = platform_columns(terrain)
+    
+    # Walk until a wall: the first platform ahead that the Goomba's rows
+    # cross and that the step reaches
+    dx = vel_x * dt
+    candidates = columns.candidates(np.minimum(x, x + dx) - 1, np.maximum(x, x + dx) + width + 1)
+    p_left = columns.left[candidates]
+    p_right = columns.right[candidates]
+    rows = ((y + height)[:, None] > columns.top[candidates]) & (y[:, None] < columns.bottom[candidates])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        forward = (dx > 0)[:, None]
+        enter = np.where(forward, p_left - x[:, None] - width, p_right - x[:, None]) / dx[:, None]
+        leave = np.where(forward, p_right - x[:, None], p_left - x[:, None] - width) / dx[:, None]
+    hits = rows & (dx != 0)[:, None] & (enter >= 0) & (enter <= 1) & (enter < leave)
+    walled = hits.any(axis=1)
+    x += dx
+    if walled.any():
+        # Every wall hit first has the same near edge, so the nearest edge
+        # ahead is where the Goomba stops
+        stop_left = np.where(hits, p_left, np.inf).min(axis=1) - width
+        stop_right = np.where(hits, p_right, -np.inf).max(axis=1)
+        x[walled] = np.where(forward[:, 0], stop_left, stop_right)[walled]
+        vel_x[walled] *= -1
+    
+    # Fall unless something is underneath, landing on the first platform
+    # top the fall reaches
+    falling = y < SCREEN_HEIGHT - height
+    if falling.any():
+        dy = 5 * dt
+        candidates = columns.candidates(x - 1, x + width + 1)
+        p_top = columns.top[candidates]
+        across = ((x + width)[:, None] > columns.left[candidates]) & (x[:, None] < columns.right[candidates])
+        enter = (p_top - y[:, None] - height) / dy
+        leave = (columns.bottom[candidates] - y[:, None]) / dy
+        lands = across & (enter >= 0) & (enter <= 1) & (enter < leave)
+        landed = falling & lands.any(axis=1)
+        y[falling & ~landed] += dy
+        y[landed] = np.where(lands, p_top, np.inf).min(axis=1)[landed] - height
+    
+    if goomba_hash is not None:
+        # Only Goombas that crossed into another cell need re-registering
+        size = goomba_hash.cell_size
+        moved = np.zeros(count, dtype=bool)
+        for before, after in zip(cell_bounds(old_x, old_y, width, height, size),
+                                 cell_bounds(x, y, width, height, size)):
+            moved |= before != after
+        handles = goombas.handles
+        for row in np.flatnonzero(moved).tolist():
+            goomba = handles[row]
+            goomba_hash.move(goomba, goomba.x, goomba.y, width, height)
+
+
+def cell_bounds(x, y, width, height, size):
+    # SpatialHash.cell_range for whole columns
+    x = np.trunc(x)
+    y = np.trunc(y)
+    return x // size, y // size, (x + width - 1) // size, (y + height - 1) // size
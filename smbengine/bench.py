@@ -0,0 +1,410 @@
+# Benchmarks for the engine.
+#
+#   python -m smbengine.bench batch     per-object vs NumPy entity updates
+#   python -m smbengine.bench vecenv    VecEnv steps per second as N grows
+#   python -m smbengine.bench level     compiled level load times vs building in Python
+#   python -m smbengine.bench active    tick cost with and without sleeping entities
+#   python -m smbengine.bench terrain   per-platform drawing vs pre-rendered terrain strips
+#   python -m smbengine.bench snapshot  simulation snapshot and restore cost
+#   python -m smbengine.bench tickrate  landing, jumps, stomps, pickups and speed at lower tick rates
+#   python -m smbengine.bench capture   frame cost of saving frames in the loop vs FrameCapture
+#   python -m smbengine.bench startup   cold import and first-frame times in fresh interpreters
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pygame
+
+from smbengine import batch
+from smbengine.capture import FrameCapture
+from smbengine.constants import BRICK_RED, FPS, SCREEN_HEIGHT, SCREEN_WIDTH, SKY_BLUE
+from smbengine.controls import JUMP, RIGHT, InputState
+from smbengine.entities import Platform
+from smbengine.level import LevelData
+from smbengine import levelfile
+from smbengine.render import TerrainLayer
+from smbengine.sim import Simulation
+from smbengine.snapshot import RewindBuffer, restore, snapshot
+from smbengine.stats import summarize
+
+
+def build_stress_level(goombas, coins, seed=1):
+    # A long flat level with scattered floating platforms and the requested
+    # number of walkers and coins spread along it
+    rng = random.Random(seed)
+    length = max(2400, 64 * max(goombas, coins))
+    platforms = [Platform(0, SCREEN_HEIGHT - 40, length, 40, (94, 53, 15))]
+    for x in range(200, length - 200, 300):
+        platforms.append(Platform(x, rng.choice((300, 350, 400, 480)), rng.choice((64, 100, 150)), 20,
+                                  BRICK_RED, rng.random() < 0.5))
+    goomba_spawns = [(rng.uniform(0, length - 32) // 1, rng.choice((200, SCREEN_HEIGHT - 72)))
+                     for _ in range(goombas)]
+    coin_spawns = [(rng.uniform(0, length - 16) // 1, rng.choice((250, 350, 500))) for _ in range(coins)]
+    return LevelData(platforms, coin_spawns, goomba_spawns)
+
+
+def time_entity_updates(level, batched, ticks):
+    sim = Simulation(level)
+    # Time every entity in the level, not just the ones near the camera;
+    # schedule() wakes those parked while the level was set up
+    sim.active_margin = None
+    sim.schedule()
+    sim.batch_threshold = 0 if batched else None
+    start = time.perf_counter()
+    for _ in range(ticks):
+        if batched:
+            batch.update_coins(sim.level_coins)
+            batch.update_goombas(sim.goombas, sim.terrain, sim.goomba_hash)
+        else:
+            for coin in sim.level_coins:
+                coin.update()
+            for goomba in sim.goombas:
+                goomba.update(sim.terrain, sim.camera_x)
+                sim.goomba_hash.move(goomba, goomba.x, goomba.y, goomba.width, goomba.height)
+    elapsed = time.perf_counter() - start
+    state = (list(sim.goombas.column("x")), list(sim.goombas.column("y")),
+             list(sim.goombas.column("vel_x")), list(sim.level_coins.column("rotation")))
+    return elapsed / ticks, state
+
+
+def bench_batch(args):
+    if not batch.available():
+        print("NumPy is not installed; only the per-object path is available")
+        return
+    print(f"{'entities':>9} {'per-object us':>14} {'batched us':>11} {'speedup':>8}  match")
+    crossover = None
+    for count in args.sizes:
+        level = build_stress_level(count, count)
+        loop, loop_state = time_entity_updates(level, False, args.ticks)
+        vec, vec_state = time_entity_updates(level, True, args.ticks)
+        match = loop_state == vec_state
+        print(f"{count:>9} {loop * 1e6:>14.1f} {vec * 1e6:>11.1f} {loop / vec:>7.2f}x  {'yes' if match else 'NO'}")
+        if crossover is None and vec < loop:
+            crossover = count
+    if crossover is None:
+        print("batched updates never won in this range")
+    else:
+        print(f"batched updates win from about {crossover} Goombas + {crossover} coins")
+
+
+def bench_vecenv(args):
+    if not batch.available():
+        print("VecEnv needs NumPy")
+        return
+    import numpy as np
+    from smbengine.vecenv import VecEnv
+    
+    rng = np.random.default_rng(1)
+    print(f"{'envs':>6} {'step() calls/s':>15} {'env steps/s':>12} {'us/env step':>12}")
+    for n in args.sizes:
+        env = VecEnv(n)
+        # Random actions, leaning right so episodes cover the whole level
+        actions = rng.choice(np.array([2, 2, 6, 6, 4, 0, 1]), size=(args.steps, n))
+        start = time.perf_counter()
+        for row in actions:
+            env.step(row)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>6} {args.steps / elapsed:>15.0f} {n * args.steps / elapsed:>12.0f} {elapsed / (n * args.steps) * 1e6:>12.1f}")
+
+
+def bench_level(args):
+    print(f"{'entities':>9} {'platforms':>10} {'file KB':>8} {'build ms':>9} {'load ms':>8} {'first query us':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            level = build_stress_level(count, count)
+            path = os.path.join(directory, f"{count}{levelfile.EXTENSION}")
+            with open(path, "wb") as f:
+                f.write(levelfile.compile_level(level))
+            
+            # Building from Python rasterises the terrain again; loading maps the file
+            start = time.perf_counter()
+            LevelData(level.platforms, level.coin_spawns, level.goomba_spawns)
+            built = time.perf_counter() - start
+            start = time.perf_counter()
+            loaded = levelfile.load_level(path)
+            load = time.perf_counter() - start
+            start = time.perf_counter()
+            loaded.terrain.query(count * 32, 300, 32, 32)
+            query = time.perf_counter() - start
+            print(f"{count:>9} {len(level.platforms):>10} {os.path.getsize(path) / 1024:>8.0f} "
+                  f"{built * 1000:>9.2f} {load * 1000:>8.2f} {query * 1e6:>15.1f}")
+
+
+def bench_active(args):
+    # Mario runs right through levels of growing size; with sleeping on the
+    # tick should cost the same however many entities the level holds
+    inputs = InputState.from_bits(RIGHT)
+    print(f"{'entities':>9} {'all us/tick':>12} {'awake':>6} {'active us/tick':>15} {'awake':>6}")
+    for count in args.sizes:
+        level = build_stress_level(count, count)
+        row = []
+        for margin in (None, args.margin):
+            sim = Simulation(level)
+            sim.active_margin = margin
+            sim.lives = 1 << 30
+            sim.tick(inputs)
+            start = time.perf_counter()
+            for _ in range(args.ticks):
+                sim.tick(inputs)
+            row.append((time.perf_counter() - start) / args.ticks * 1e6)
+            row.append(len(sim.goombas) + len(sim.level_coins))
+        print(f"{2 * count:>9} {row[0]:>12.1f} {row[1]:>6} {row[2]:>15.1f} {row[3]:>6}")
+
+
+def bench_terrain(args):
+    # The camera sweeps the first screens of levels of growing length, as a
+    # run would; the strips should cost the same whatever the platform count
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    print(f"{'platforms':>10} {'per-platform us/frame':>22} {'strips us/frame':>16}")
+    for count in args.sizes:
+        level = build_stress_level(0, count)
+        layer = TerrainLayer(level.terrain)
+        row = []
+        for draw in ([platform.draw for platform in level.platforms], [layer.draw]):
+            start = time.perf_counter()
+            for frame in range(args.frames):
+                screen.fill(SKY_BLUE)
+                for call in draw:
+                    call(screen, frame * 5)
+            row.append((time.perf_counter() - start) / args.frames * 1e6)
+        print(f"{len(level.platforms):>10} {row[0]:>22.1f} {row[1]:>16.1f}")
+
+
+def bench_snapshot(args):
+    # Snapshots taken a little way into levels of growing size, with the
+    # default active region so most entities are asleep in the big ones, and
+    # how much of its 10 seconds the default rewind buffer holds after
+    # running on for 10 seconds more
+    inputs = InputState.from_bits(RIGHT)
+    print(f"{'entities':>9} {'awake':>6} {'bytes':>8} {'snapshot us':>12} {'restore us':>11} {'rewind s':>9}")
+    for count in args.sizes:
+        sim = Simulation(build_stress_level(count, count))
+        sim.lives = 1 << 30
+        for _ in range(120):
+            sim.tick(inputs)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            data = snapshot(sim)
+        taken = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            restore(sim, data)
+        restored = time.perf_counter() - start
+        
+        rewind = RewindBuffer()
+        for _ in range(10 * FPS):
+            rewind.push(sim)
+            sim.tick(inputs)
+        print(f"{2 * count:>9} {len(sim.goombas) + len(sim.level_coins):>6} {len(data):>8} "
+              f"{taken / args.repeat * 1e6:>12.1f} {restored / args.repeat * 1e6:>11.1f} {len(rewind) / FPS:>9.1f}")
+
+
+def jump_trajectory(rate):
+    # Mario jumping once from the ground of the default level: {frame: height
+    # above the ground} for every tick in the air, and the frame he lands on
+    sim = Simulation(tick_rate=rate)
+    mario = sim.mario
+    ground = mario.y = SCREEN_HEIGHT - 40 - mario.height
+    mario.on_ground = True
+    heights = {}
+    inputs = InputState.from_bits(JUMP)
+    for tick in range(1, rate * 5):
+        sim.tick(inputs)
+        inputs = InputState.from_bits(0)
+        if mario.on_ground:
+            return heights, tick * sim.dt
+        heights[tick * sim.dt] = ground - mario.y
+    return heights, None
+
+
+def stomps(rate, drops=16):
+    # Mario dropped onto a Goomba standing still from drops different
+    # heights; how many times he stomps it
+    ground = SCREEN_HEIGHT - 40
+    stomped = 0
+    for drop in range(drops):
+        sim = Simulation(LevelData([Platform(0, ground, SCREEN_WIDTH * 3, 40)], [], [(300, ground - 32)]),
+                         tick_rate=rate)
+        for goomba in sim.goombas:
+            goomba.vel_x = 0
+        sim.mario.x = 300
+        sim.mario.y = ground - 64 - 10 - 20 * drop
+        sim.step(n=rate)
+        stomped += len(sim.goombas) == 0
+    return stomped
+
+
+def pickups(rate, count=20):
+    # Coins picked up running right along a row of count coins on the ground
+    ground = SCREEN_HEIGHT - 40
+    coins = [(300 + i * 40, ground - 24) for i in range(count)]
+    sim = Simulation(LevelData([Platform(0, ground, SCREEN_WIDTH * 3, 40)], coins, []), tick_rate=rate)
+    sim.step(InputState.from_bits(RIGHT), 5 * rate)
+    return sim.coins
+
+
+def bench_tickrate(args):
+    # Mario dropped at terminal velocity onto every floating platform of the
+    # default level, one jump compared with the 60 Hz run at the frames both
+    # runs have a tick on (landing rounds up to the next tick), stomps and
+    # coin pickups against the 60 Hz counts, and how much game time a second
+    # of CPU simulates
+    floating = levelfile.build_default_level().platforms[1:]
+    inputs = InputState.from_bits(RIGHT)
+    reference, reference_landing = jump_trajectory(FPS)
+    reference_stomps = stomps(FPS)
+    reference_pickups = pickups(FPS)
+    print(f"{'ticks/s':>8} {'landed':>7} {'jump px':>8} {'60 Hz px':>9} {'airtime':>8} {'60 Hz':>6} "
+          f"{'stomps':>7} {'60 Hz':>6} {'coins':>6} {'60 Hz':>6} {'game s per s':>13}")
+    for rate in args.rates:
+        landed = 0
+        for platform in floating:
+            sim = Simulation(tick_rate=rate)
+            sim.mario.x = platform.x + 40
+            sim.mario.y = platform.y - 250
+            sim.mario.vel_y = 15
+            sim.step(n=rate)
+            landed += sim.mario.y == platform.y - sim.mario.height
+        
+        heights, landing = jump_trajectory(rate)
+        dt = FPS / rate
+        expected = max(reference[frame] for frame in heights if frame in reference)
+        expected_landing = -(-reference_landing // dt) * dt
+        
+        sim = Simulation(build_stress_level(200, 200), tick_rate=rate)
+        sim.lives = 1 << 30
+        start = time.perf_counter()
+        sim.step(inputs, args.seconds * rate)
+        elapsed = time.perf_counter() - start
+        print(f"{rate:>8} {landed:>3} of {len(floating)} {max(heights.values()):>8.1f} {expected:>9.1f} "
+              f"{landing:>8.0f} {expected_landing:>6.0f} {stomps(rate):>7} {reference_stomps:>6} "
+              f"{pickups(rate):>6} {reference_pickups:>6} {args.seconds / elapsed:>13.0f}")
+
+
+def bench_capture(args):
+    # Main-thread cost per frame of getting a level frame to disk, with the
+    # frames paced at FPS so the writer thread gets the gaps between them
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    layer = TerrainLayer(build_stress_level(0, 100).terrain)
+    print(f"{'mode':>16} {'p50 us':>9} {'p99 us':>9} {'written':>8} {'dropped':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        modes = [("save png", None, None)]
+        modes += [(f"{format} {policy}", format, policy) for format in ("raw", "png") for policy in ("drop", "block")]
+        for name, format, policy in modes:
+            path = os.path.join(directory, name.replace(" ", "-") + (".rgb" if format == "raw" else ""))
+            capture = FrameCapture(path, screen.get_size(), format, policy) if format else None
+            costs = []
+            deadline = time.perf_counter()
+            for frame in range(args.frames):
+                screen.fill(SKY_BLUE)
+                layer.draw(screen, frame * 5)
+                start = time.perf_counter()
+                if capture is None:
+                    pygame.image.save(screen, f"{path}-{frame}.png")
+                else:
+                    capture.push(screen)
+                costs.append(time.perf_counter() - start)
+                deadline += 1 / FPS
+                time.sleep(max(0.0, deadline - time.perf_counter()))
+            if capture is None:
+                written, dropped = args.frames, 0
+            else:
+                capture.close()
+                written, dropped = capture.frames, capture.dropped
+            stats = summarize(costs)
+            print(f"{name:>16} {stats['p50'] * 1e6:>9.0f} {stats['p99'] * 1e6:>9.0f} {written:>8} {dropped:>8}")
+
+
+# (name, code) timed in a fresh interpreter each; pygame.init() is what the
+# scripts used to run at import time
+STARTUP_STEPS = (
+    ("interpreter", "pass"),
+    ("import pygame", "import pygame"),
+    ("pygame.init()", "import pygame; pygame.init()"),
+    ("import smbengine.sim", "import smbengine.sim"),
+    ("import smbengine.game", "import smbengine.game"),
+    ("first frame", "from smbengine.game import Game; Game().draw()"),
+)
+
+
+def bench_startup(args):
+    # Wall time of each step from process start, median of --repeat runs
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (root, os.environ.get("PYTHONPATH")))))
+    results = {}
+    print(f"{'step':>22} {'median ms':>10} {'min ms':>8}")
+    for name, code in STARTUP_STEPS:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        results[name] = {"median": statistics.median(times), "min": min(times)}
+        print(f"{name:>22} {results[name]['median'] * 1000:>10.1f} {results[name]['min'] * 1000:>8.1f}")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m smbengine.bench")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    p = commands.add_parser("batch", help="per-object vs NumPy entity updates")
+    p.add_argument("--ticks", type=int, default=200)
+    p.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16, 32, 48, 64, 128, 512, 2048, 8192])
+    p.set_defaults(run=bench_batch)
+    
+    p = commands.add_parser("vecenv", help="VecEnv steps per second as N grows")
+    p.add_argument("--steps", type=int, default=300)
+    p.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16, 64, 256])
+    p.set_defaults(run=bench_vecenv)
+    
+    p = commands.add_parser("level", help="compiled level load times vs building in Python")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000, 100000])
+    p.set_defaults(run=bench_level)
+    
+    p = commands.add_parser("active", help="tick cost with and without sleeping entities")
+    p.add_argument("--ticks", type=int, default=300)
+    p.add_argument("--margin", type=int, default=256)
+    p.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    p.set_defaults(run=bench_active)
+    
+    p = commands.add_parser("terrain", help="per-platform drawing vs pre-rendered terrain strips")
+    p.add_argument("--frames", type=int, default=600)
+    p.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000, 100000])
+    p.set_defaults(run=bench_terrain)
+    
+    p = commands.add_parser("snapshot", help="simulation snapshot and restore cost")
+    p.add_argument("--repeat", type=int, default=1000)
+    p.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500, 5000])
+    p.set_defaults(run=bench_snapshot)
+    
+    p = commands.add_parser("tickrate", help="landing, jumps, stomps, pickups and speed at lower tick rates")
+    p.add_argument("--seconds", type=int, default=20, help="game time simulated for the speed column")
+    p.add_argument("--rates", type=int, nargs="+", default=[60, 30, 15, 10, 5])
+    p.set_defaults(run=bench_tickrate)
+    
+    p = commands.add_parser("capture", help="frame cost of saving frames in the loop vs FrameCapture")
+    p.add_argument("--frames", type=int, default=120)
+    p.set_defaults(run=bench_capture)
+    
+    p = commands.add_parser("startup", help="cold import and first-frame times in fresh interpreters")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--report", metavar="FILE", help="also write the times to FILE as JSON, for comparing runs")
+    p.set_defaults(run=bench_startup)
+    
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Asynchronous gameplay capture.
+#
+# Saving a screenshot from the game loop stalls the frame while the image is
+# converted, compressed and written. FrameCapture only copies each presented
+# frame into one of a fixed pool of surfaces, which is a plain blit between
+# surfaces of the same format, and hands it to a writer thread that does the
+# slow part and returns the surface to the pool. Nothing is allocated per
+# frame. When the writer falls behind and the pool runs dry, the "drop"
+# policy skips the frame and counts it, so the game never waits; "block"
+# waits for a free surface, for captures that must not miss a frame such as
+# replays recorded for QA.
+#
+# Output is either one raw RGB24 file, e.g. for
+#   ffmpeg -f rawvideo -pixel_format rgb24 -video_size 800x600 -framerate 60 -i capture.rgb capture.mp4
+# or a directory of numbered PNGs. Only surfaces are involved, so capture
+# works the same under the SDL dummy video driver.
+
+import os
+import queue
+import threading
+
+import pygame
+
+FORMATS = ("raw", "png")
+POLICIES = ("drop", "block")
+
+
+class FrameCapture:
+    def __init__(self, path, size, format=None, policy="drop", depth=8, like=None):
+        # format defaults to raw for a .rgb path and PNG otherwise; like is
+        # a surface whose pixel format the pool copies, normally the display
+        if format is None:
+            format = "raw" if path.endswith(".rgb") else "png"
+        if format not in FORMATS:
+            raise ValueError(f"unknown capture format {format!r}")
+        if policy not in POLICIES:
+            raise ValueError(f"unknown capture policy {policy!r}")
+        self.path = path
+        self.format = format
+        self.policy = policy
+        self.frames = 0    # frames handed to the writer
+        self.dropped = 0   # frames skipped because every buffer was in use
+        self.error = None  # exception that stopped the writer, if any
+
+        if format == "raw":
+            self.output = open(path, "wb")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.output = None
+
+        # Free surfaces, and frames waiting for the writer; the pool size
+        # bounds both
+        self.free = queue.Queue()
+        for _ in range(depth):
+            self.free.put(pygame.Surface(size, 0, like) if like is not None else pygame.Surface(size))
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self.write_frames, name="frame-capture", daemon=True)
+        self.writer.start()
+
+    def push(self, surface):
+        # Copy a presented frame; returns False if it was dropped
+        try:
+            buffer = self.free.get(self.policy == "block")
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        buffer.blit(surface, (0, 0))
+        self.pending.put((self.frames, buffer))
+        self.frames += 1
+        return True
+
+    def write_frames(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            index, buffer = item
+            try:
+                if self.error is None:
+                    if self.output is not None:
+                        self.output.write(pygame.image.tobytes(buffer, "RGB"))
+                    else:
+                        pygame.image.save(buffer, os.path.join(self.path, f"frame_{index:06d}.png"))
+            except Exception as error:
+                # Keep handing buffers back so the game is never stuck
+                # waiting on a writer that can no longer write
+                self.error = error
+            self.free.put(buffer)
+
+    def close(self):
+        # Finish writing everything queued; raises whatever stopped the writer
+        self.pending.put(None)
+        self.writer.join()
+        if self.output is not None:
+            self.output.close()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,98 @@
+# The original single-level prototype, running on the engine.
+#
+# One level with no overworld, HUD bar or time limit: Mario, a few platforms,
+# coins and Goombas, with the score and lives in the corners. It plays on the
+# same Simulation, entities and sprites as the full game, and like
+# smbengine.game it starts the display and fonts only when a game is created.
+
+import pygame
+
+from smbengine.constants import FPS, SCREEN_HEIGHT, SCREEN_WIDTH, SKY_BLUE, WHITE
+from smbengine.controls import InputState
+from smbengine.entities import Platform
+from smbengine.level import LevelData
+from smbengine.runtime import load_font, open_window
+from smbengine.sim import Simulation
+from smbengine.sprites import sprite_atlas
+from smbengine.text import text_cache
+
+
+def build_classic_level():
+    # The prototype's layout, all plain brick; the camera follows Mario as
+    # far right as he goes and the level never finishes
+    platforms = [Platform(0, SCREEN_HEIGHT - 40, SCREEN_WIDTH * 3, 40)]
+
+    # Some floating platforms
+    platforms.append(Platform(200, 400, 200, 20))
+    platforms.append(Platform(500, 350, 150, 20))
+    platforms.append(Platform(700, 300, 100, 20))
+    platforms.append(Platform(900, 400, 200, 20))
+
+    coins = [(300 + i * 50, 350) for i in range(10)]
+    goombas = [(400, 368), (800, 368)]
+
+    level = LevelData(platforms, coins, goombas)
+    level.camera_limit = None
+    level.finish_x = None
+    return level
+
+
+class ClassicGame:
+    def __init__(self):
+        self.screen = open_window((SCREEN_WIDTH, SCREEN_HEIGHT), "Mario-like Game")
+        sprite_atlas()  # build the sprite frames now that the display exists
+        self.clock = pygame.time.Clock()
+        self.running = True
+        self.font = load_font(None, 36)
+
+        self.sim = Simulation(build_classic_level())
+        self.sim.time_left = float("inf")  # no timer in the prototype
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+
+    def update(self):
+        self.sim.tick(InputState.from_keys(pygame.key.get_pressed()))
+
+        # Losing the last life ends the game
+        if self.sim.status != "playing":
+            self.running = False
+
+    def draw(self):
+        sim = self.sim
+        camera_x = sim.camera_x
+        self.screen.fill(SKY_BLUE)
+
+        for platform in sim.platforms:
+            platform.draw(self.screen, camera_x)
+        for coin in sim.level_coins:
+            coin.draw(self.screen, camera_x)
+        for goomba in sim.goombas:
+            goomba.draw(self.screen, camera_x)
+        sim.mario.draw(self.screen, camera_x)
+
+        score_text = text_cache.render(self.font, f"Score: {sim.score}", WHITE)
+        lives_text = text_cache.render(self.font, f"Lives: {sim.lives}", WHITE)
+        self.screen.blit(score_text, (10, 10))
+        self.screen.blit(lives_text, (SCREEN_WIDTH - 120, 10))
+
+        pygame.display.flip()
+
+    def run(self):
+        while self.running:
+            self.handle_events()
+            self.update()
+            self.draw()
+            self.clock.tick(FPS)
+
+        pygame.quit()
+
+
+def main():
+    ClassicGame().run()
+
+
+if __name__ == "__main__":
+    main()
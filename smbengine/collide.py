@@ -0,0 +1,107 @@
+# Swept AABB collision against static terrain.
+#
+# Moving a box by its whole step and then pushing it out of whatever it
+# overlaps lets anything that moves further in one tick than a platform is
+# thick pass straight through it: Mario at terminal velocity against the
+# 20 px floating platforms, or everything once the simulation runs at a low
+# tick rate. move() instead finds the time of impact against each platform
+# the step can reach, stops the box at the first contact and slides it along
+# that surface for the rest of the step, so results no longer depend on
+# small steps. A box that already overlaps a platform is never stopped by
+# it; it can only get there by being placed, and it is free to move out.
+#
+# sweep_overlaps() answers the same question for things Mario collects or
+# hits rather than stands on: whether a step passes through them at all.
+
+INF = float("inf")
+
+
+def time_of_impact(x, y, width, height, dx, dy, rect):
+    # (fraction of the step, hit on x) for the first contact of the box
+    # moving by (dx, dy) with rect, or None if it never touches it in the
+    # step. Contacts on a corner count as landing on the top or bottom
+    if dx > 0:
+        enter_x = (rect.left - x - width) / dx
+        leave_x = (rect.right - x) / dx
+    elif dx < 0:
+        enter_x = (rect.right - x) / dx
+        leave_x = (rect.left - x - width) / dx
+    elif x + width > rect.left and x < rect.right:
+        enter_x, leave_x = -INF, INF
+    else:
+        return None
+
+    if dy > 0:
+        enter_y = (rect.top - y - height) / dy
+        leave_y = (rect.bottom - y) / dy
+    elif dy < 0:
+        enter_y = (rect.bottom - y) / dy
+        leave_y = (rect.top - y - height) / dy
+    elif y + height > rect.top and y < rect.bottom:
+        enter_y, leave_y = -INF, INF
+    else:
+        return None
+
+    enter = max(enter_x, enter_y)
+    if enter < 0 or enter > 1 or enter >= min(leave_x, leave_y):
+        return None
+    return enter, enter_x > enter_y
+
+
+def move(terrain, x, y, width, height, dx, dy):
+    # Move the box by (dx, dy) through terrain. Returns (x, y, hit_x, hit_y)
+    # where hit_x and hit_y are the direction (1 or -1) of the motion that
+    # was stopped on each axis, or 0
+
+    # Every platform the step can reach; one pixel of slack on each side
+    # since the terrain grids work in whole pixels
+    platforms = terrain.query(min(x, x + dx) - 1, min(y, y + dy) - 1, width + abs(dx) + 2, height + abs(dy) + 2)
+    hit_x = hit_y = 0
+
+    # Each contact stops one axis, so this runs at most three times
+    while dx or dy:
+        first = None
+        for platform in platforms:
+            impact = time_of_impact(x, y, width, height, dx, dy, platform.rect)
+            if impact is not None and (first is None or impact[0] < first[0]):
+                first = impact
+                rect = platform.rect
+        if first is None:
+            x += dx
+            y += dy
+            break
+
+        t, on_x = first
+        if on_x:
+            hit_x = 1 if dx > 0 else -1
+            x = rect.left - width if dx > 0 else rect.right
+            y += dy * t
+            dy *= 1 - t
+            dx = 0
+        else:
+            hit_y = 1 if dy > 0 else -1
+            y = rect.top - height if dy > 0 else rect.bottom
+            x += dx * t
+            dx *= 1 - t
+            dy = 0
+    return x, y, hit_x, hit_y
+
+
+def sweep_overlaps(x, y, width, height, dx, dy, other_x, other_y, other_width, other_height):
+    # Whether the box moving by (dx, dy) overlaps the other, still box at
+    # any point of the step. Touching edges do not count, as with
+    # pygame.Rect.colliderect; for two moving boxes pass the relative motion
+    enter = 0.0
+    leave = 1.0
+    for start, size, delta, low, other_size in ((x, width, dx, other_x, other_width),
+                                                (y, height, dy, other_y, other_height)):
+        if delta:
+            a = (low - start - size) / delta
+            b = (low + other_size - start) / delta
+            if a > b:
+                a, b = b, a
+            enter = max(enter, a)
+            leave = min(leave, b)
+        elif not (start + size > low and start < low + other_size):
+            return False
+    return enter < leave
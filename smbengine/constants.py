@@ -0,0 +1,23 @@
+# Game constants shared by the simulation and the renderers
+
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+FPS = 60
+TILE_SIZE = 32
+
+# Colors
+SKY_BLUE = (92, 148, 252)
+MARIO_RED = (255, 0, 0)
+MARIO_BLUE = (0, 0, 255)
+BRICK_RED = (205, 92, 92)
+PIPE_GREEN = (0, 128, 0)
+COIN_YELLOW = (255, 255, 0)
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GRASS_GREEN = (76, 175, 80)
+SAND_YELLOW = (237, 212, 111)
+WATER_BLUE = (64, 164, 223)
+CASTLE_GRAY = (128, 128, 128)
+HUD_BLUE = (0, 80, 160)
+HUD_RED = (220, 0, 0)
+HUD_GOLD = (255, 204, 0)
@@ -0,0 +1,47 @@
+# Per-tick input state fed to the simulation.
+#
+# Mario.update reads one of these instead of polling the keyboard, so the
+# simulation can be driven by the real keyboard, a recording or a script.
+
+import pygame
+
+LEFT = 1
+RIGHT = 2
+JUMP = 4
+REWIND = 8  # held to step the game back in time; the simulation ignores it
+
+
+class InputState:
+    __slots__ = ("left", "right", "jump", "rewind")
+
+    def __init__(self, left=False, right=False, jump=False, rewind=False):
+        self.left = left
+        self.right = right
+        self.jump = jump
+        self.rewind = rewind
+
+    def __eq__(self, other):
+        return isinstance(other, InputState) and self.bits() == other.bits()
+
+    def __hash__(self):
+        return self.bits()
+
+    def __repr__(self):
+        return f"InputState(left={self.left}, right={self.right}, jump={self.jump}, rewind={self.rewind})"
+
+    @classmethod
+    def from_keys(cls, keys):
+        # keys is the sequence returned by pygame.key.get_pressed()
+        return cls(bool(keys[pygame.K_LEFT]), bool(keys[pygame.K_RIGHT]), bool(keys[pygame.K_SPACE]),
+                   bool(keys[pygame.K_r]))
+
+    @classmethod
+    def from_bits(cls, bits):
+        return cls(bool(bits & LEFT), bool(bits & RIGHT), bool(bits & JUMP), bool(bits & REWIND))
+
+    def bits(self):
+        return ((LEFT if self.left else 0) | (RIGHT if self.right else 0) | (JUMP if self.jump else 0)
+                | (REWIND if self.rewind else 0))
+
+
+NO_INPUT = InputState()
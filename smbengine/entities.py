@@ -0,0 +1,187 @@
+# Level entities: Mario, static platforms, coins and Goombas.
+#
+# Nothing in here touches the display or the keyboard. Updates only need the
+# terrain and an InputState, and the draw methods take whatever surface they
+# are given, so these run the same in the game and in headless tools.
+#
+# Speeds are in pixels per 60 Hz frame; updates take dt, the length of the
+# tick in such frames, so the simulation can also run at lower tick rates.
+
+import math
+
+import pygame
+
+from smbengine.collide import move
+from smbengine.constants import BRICK_RED, SCREEN_HEIGHT, SCREEN_WIDTH
+from smbengine.render import platform_surface, scale_point
+from smbengine.sprites import sprite_atlas
+from smbengine.store import EntityHandle
+
+class Mario:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.width = 32
+        self.height = 32
+        self.vel_x = 0
+        self.vel_y = 0
+        self.speed = 5
+        self.jump_power = 15
+        self.on_ground = False
+        self.facing_right = True
+        self.power_up_state = 0  # 0 = small, 1 = super, 2 = fire
+        self.prev_x = x  # position before the last tick, for interpolated drawing
+        self.prev_y = y
+        
+    def update(self, inputs, terrain, camera_x, dt=1.0):
+        # Handle input
+        self.vel_x = 0
+        
+        if inputs.right:
+            self.vel_x = self.speed
+            self.facing_right = True
+        if inputs.left:
+            self.vel_x = -self.speed
+            self.facing_right = False
+        if inputs.jump and self.on_ground:
+            self.vel_y = -self.jump_power
+            self.on_ground = False
+            
+        # Apply gravity one 60 Hz frame at a time, so a long tick falls
+        # exactly as far as the frames it stands for would
+        dy = 0
+        remaining = dt
+        while remaining > 0:
+            step = min(remaining, 1.0)
+            self.vel_y += 0.8 * step  # Gravity strength
+            if self.vel_y > 15:  # Terminal velocity
+                self.vel_y = 15
+            dy += self.vel_y * step
+            remaining -= step
+            
+        # Move as far as the platforms allow: landing on one puts Mario on
+        # the ground, bumping his head stops the jump, and walls stop him
+        self.x, self.y, hit_x, hit_y = move(terrain, self.x, self.y, self.width, self.height,
+                                            self.vel_x * dt, dy)
+        self.on_ground = hit_y > 0
+        if hit_y:
+            self.vel_y = 0
+        
+        # Boundary checking - prevent falling through bottom
+        if self.y > SCREEN_HEIGHT - self.height:
+            self.y = SCREEN_HEIGHT - self.height
+            self.on_ground = True
+            self.vel_y = 0
+            
+        # Left boundary
+        if self.x < 0:
+            self.x = 0
+            
+    def sprite(self, camera_x, scale=1, alpha=1.0):
+        # (surface, position, area) to blit, or None when off screen; alpha
+        # places Mario that far between his previous and current positions
+        x = self.x - (self.x - self.prev_x) * (1 - alpha) - camera_x
+        if -self.width < x < SCREEN_WIDTH:
+            # Small Mario, or super Mario for any power-up
+            key = ("mario", min(self.power_up_state, 1), self.facing_right)
+            return sprite_atlas(scale).sprite(key, x, self.y - (self.y - self.prev_y) * (1 - alpha))
+        return None
+        
+    def draw(self, screen, camera_x, scale=1, alpha=1.0):
+        sprite = self.sprite(camera_x, scale, alpha)
+        if sprite is not None:
+            screen.blit(*sprite)
+
+class Platform:
+    def __init__(self, x, y, width, height, color=BRICK_RED, breakable=False):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.color = color
+        self.breakable = breakable
+        self.rect = pygame.Rect(x, y, width, height)  # Platforms never move
+        
+    def draw(self, screen, camera_x, scale=1):
+        x = self.x - camera_x
+        
+        # Only draw if on screen
+        if -self.width < x < SCREEN_WIDTH:
+            # One blit of the cached texture instead of a rect per brick cell
+            screen.blit(platform_surface(self.width, self.height, self.color, self.breakable, scale),
+                        scale_point(x, self.y, scale))
+
+class Coin(EntityHandle):
+    # Stored in an EntityStore; spawn with store.spawn(x=..., y=...)
+    __slots__ = ()
+    columns = (("x", "d", 0.0), ("y", "d", 0.0), ("rotation", "d", 0.0))
+    width = 16
+    height = 16
+    
+    @property
+    def collected(self):
+        # Collected coins are removed from their store
+        return not self.live
+        
+    def update(self, dt=1.0):
+        if not self.collected:
+            self.rotation += 0.2 * dt  # Animation speed
+            
+    def sprite(self, camera_x, width=None, scale=1):
+        # width may be passed in when computed for all coins at once
+        if not self.collected:
+            x = self.x - camera_x
+            
+            # Only draw if on screen
+            if -self.width < x < SCREEN_WIDTH:
+                # Create spinning effect using sine wave; one atlas frame per width
+                if width is None:
+                    width = int(self.width * abs(math.sin(self.rotation)))
+                return sprite_atlas(scale).sprite(("coin", width), x, self.y)
+        return None
+        
+    def draw(self, screen, camera_x, width=None, scale=1):
+        sprite = self.sprite(camera_x, width, scale)
+        if sprite is not None:
+            screen.blit(*sprite)
+
+class Goomba(EntityHandle):
+    # Stored in an EntityStore; spawn with store.spawn(x=..., y=...)
+    __slots__ = ()
+    # Move left initially; px and py hold the position before the last tick
+    columns = (("x", "d", 0.0), ("y", "d", 0.0), ("vel_x", "d", -1.0), ("px", "d", 0.0), ("py", "d", 0.0))
+    width = 32
+    height = 32
+    
+    @property
+    def alive(self):
+        # Stomped Goombas are removed from their store
+        return self.live
+        
+    def update(self, terrain, camera_x, dt=1.0):
+        if self.alive:
+            # Walk until a wall, then turn around
+            x, y, hit_x, _ = move(terrain, self.x, self.y, self.width, self.height, self.vel_x * dt, 0)
+            if hit_x:
+                self.vel_x *= -1
+            
+            # Fall unless something is underneath; standing on a platform
+            # stops the fall straight away
+            if y < SCREEN_HEIGHT - self.height:
+                x, y, _, _ = move(terrain, x, y, self.width, self.height, 0, 5 * dt)
+            self.x = x
+            self.y = y
+                    
+    def sprite(self, camera_x, scale=1, alpha=1.0):
+        if self.alive:
+            x = self.x - (self.x - self.px) * (1 - alpha) - camera_x
+            
+            # Only draw if on screen
+            if -self.width < x < SCREEN_WIDTH:
+                return sprite_atlas(scale).sprite(("goomba",), x, self.y - (self.y - self.py) * (1 - alpha))
+        return None
+        
+    def draw(self, screen, camera_x, scale=1, alpha=1.0):
+        sprite = self.sprite(camera_x, scale, alpha)
+        if sprite is not None:
+            screen.blit(*sprite)
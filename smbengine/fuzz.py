@@ -0,0 +1,182 @@
+# Level completability fuzzer.
+#
+#   python -m smbengine.fuzz [--level FILE] [--runs N] [--workers N] [--save FILE]
+#   python -m smbengine.fuzz [--level FILE] --play FILE
+#
+# Plays thousands of input sequences against a level headlessly, spread over
+# a process pool, and reports whether the completion check (Mario past the
+# level's finish_x) can be reached without losing a life, and the shortest
+# input trace that gets there. The first generation is random; later ones
+# mostly mutate the best traces so far (furthest reached, or fewest ticks
+# once the level has been finished), so the search concentrates on the
+# section that keeps killing Mario instead of replaying the easy start.
+#
+# Each task is a batch of runs that only sends back its best few traces,
+# and the level is built once per worker, so the workers spend their time
+# simulating rather than pickling; runs/s grows with the core count.
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+from smbengine.controls import JUMP, LEFT, RIGHT, InputState
+from smbengine.levelfile import build_default_level, ensure_compiled, open_level
+from smbengine.replay import InputRecorder, InputReplay
+from smbengine.sim import Simulation
+
+# Moves a run holds for a random number of ticks, weighted toward the right
+MOVES = (RIGHT, RIGHT, RIGHT | JUMP, RIGHT | JUMP, JUMP, 0, LEFT, LEFT | JUMP)
+STATES = [InputState.from_bits(bits) for bits in range(8)]
+
+worker_level = None  # the level under test, built once per process by init_worker
+
+
+def init_worker(level_path):
+    global worker_level
+    worker_level = open_level(level_path) if level_path else build_default_level()
+
+
+def random_inputs(rng, length, prefix=b""):
+    trace = bytearray(prefix)
+    while len(trace) < length:
+        trace.extend(bytes((rng.choice(MOVES),)) * rng.randint(1, 30))
+    return bytes(trace[:length])
+
+
+def play(level, trace):
+    # Run one trace from the start of the level on a fresh simulation;
+    # returns (completed, ticks played, furthest x)
+    sim = Simulation(level)
+    lives = sim.lives
+    furthest = sim.mario.x
+    for tick, bits in enumerate(trace):
+        sim.tick(STATES[bits])
+        if sim.lives < lives or sim.status == "game_over":
+            return False, tick + 1, furthest
+        furthest = max(furthest, sim.mario.x)
+        if sim.status == "complete":
+            return True, tick + 1, furthest
+    return False, len(trace), furthest
+
+
+def rank(result):
+    completed, ticks, furthest, _ = result
+    return (1, -ticks) if completed else (0, furthest)
+
+
+def run_batch(task):
+    # Play `runs` traces and return the best `keep` as
+    # (completed, ticks, furthest x, trace up to the end of the run)
+    seed, parents, runs, length, keep = task
+    rng = random.Random(seed)
+    results = []
+    for _ in range(runs):
+        if parents and rng.random() < 0.8:
+            # Keep the parent up to a little before it ended and re-roll the rest
+            parent = rng.choice(parents)
+            cut = len(parent) - rng.randint(0, min(len(parent), 180))
+            trace = random_inputs(rng, length, parent[:cut])
+        else:
+            trace = random_inputs(rng, length)
+        completed, ticks, furthest = play(worker_level, trace)
+        results.append((completed, ticks, furthest, trace[:ticks]))
+    results.sort(key=rank, reverse=True)
+    return results[:keep]
+
+
+def fuzz(level_path=None, runs=2000, workers=None, length=3000, seed=0, batch_runs=25, elite=8):
+    # Returns (best results, best first, as from run_batch; runs played)
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    best = []
+    played = 0
+
+    # Compile a JSON description once here; workers opening it at the same
+    # time would each rebuild the same compiled file
+    if level_path and level_path.endswith(".json"):
+        level_path = ensure_compiled(level_path)
+
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, init_worker, (level_path,))
+        play_batches = pool.imap
+    else:
+        init_worker(level_path)
+        play_batches = map
+
+    try:
+        while played < runs:
+            # One generation: a few batches per worker, all mutating the same parents
+            parents = [trace for _, _, _, trace in best]
+            tasks = []
+            for _ in range(workers * 4):
+                count = min(batch_runs, runs - played)
+                if count <= 0:
+                    break
+                tasks.append((rng.getrandbits(32), parents, count, length, elite))
+                played += count
+            for results in play_batches(run_batch, tasks):
+                best = sorted(best + results, key=rank, reverse=True)[:elite]
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return best, played
+
+
+def play_saved(level_path, path):
+    # Play a trace saved with --save from the start of the level, as the
+    # fuzzer did; the game's --replay starts on the overworld instead
+    init_worker(level_path)
+    replay = InputReplay.load(path)
+    trace = bytes(replay.next()[0].bits() & (LEFT | RIGHT | JUMP) for _ in range(len(replay)))
+    completed, ticks, furthest = play(worker_level, trace)
+    if not completed:
+        print(f"NOT completed: the trace ends after {ticks} ticks at x {furthest:.0f}")
+        return 1
+    print(f"completed in {ticks} ticks ({ticks / 60:.1f} s)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m smbengine.fuzz",
+                                     description="Check that a level can be finished without losing a life.")
+    parser.add_argument("--level", metavar="FILE",
+                        help="level description (.json) or compiled level to test (default: levels/1-1.json)")
+    parser.add_argument("--runs", type=int, default=2000, help="input sequences to try")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--ticks", type=int, default=3000, help="longest run, in ticks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="FILE",
+                        help="write the shortest completing trace as an input recording of the level's ticks, "
+                             "for --play (the game's --replay starts on the overworld and cannot play it)")
+    parser.add_argument("--play", metavar="FILE", help="play a trace saved with --save on the level instead of fuzzing")
+    args = parser.parse_args(argv)
+
+    if args.play:
+        return play_saved(args.level, args.play)
+
+    start = time.perf_counter()
+    best, played = fuzz(args.level, args.runs, args.workers, args.ticks, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{played} runs in {elapsed:.1f} s ({played / elapsed:.0f} runs/s)")
+
+    completed, ticks, furthest, trace = best[0]
+    if not completed:
+        print(f"NOT completed: furthest x reached was {furthest:.0f}")
+        return 1
+    print(f"completable: shortest trace finishes in {ticks} ticks ({ticks / 60:.1f} s)")
+    if args.save:
+        # One entry per level tick, starting with the tick the level begins on
+        recorder = InputRecorder()
+        for bits in trace:
+            recorder.record(STATES[bits])
+        recorder.save(args.save)
+        print(f"saved to {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,696 @@
+# The Super Mario Bros 3-style game: overworld map, levels, HUD and main loop.
+#
+# Everything the game does between frames is in the headless Simulation;
+# Game adds the window, the keyboard, the overworld and the drawing. The
+# script entry points only call main(), so importing this module opens no
+# window and starts no pygame subsystem: the display and fonts come up when
+# a Game is created.
+
+import argparse
+import json
+import os
+import random
+import time
+
+import pygame
+
+from smbengine import batch
+from smbengine.capture import FORMATS, POLICIES, FrameCapture
+from smbengine.constants import (
+    BLACK, CASTLE_GRAY, COIN_YELLOW, FPS, GRASS_GREEN, HUD_BLUE, HUD_GOLD, HUD_RED, MARIO_RED,
+    PIPE_GREEN, SAND_YELLOW, SCREEN_HEIGHT, SCREEN_WIDTH, SKY_BLUE, WATER_BLUE, WHITE,
+)
+from smbengine.controls import NO_INPUT, InputState
+from smbengine.hud import HudLayer
+from smbengine.level import LevelLoader
+from smbengine.levelfile import LEVEL_DIR, open_level
+from smbengine.procgen import EndlessLevel
+from smbengine.profiler import FrameProfiler
+from smbengine.render import TerrainLayer, display_format
+from smbengine.replay import InputRecorder, InputReplay
+from smbengine.runtime import load_font, open_window
+from smbengine.sim import Simulation
+from smbengine.snapshot import RewindBuffer, restore
+from smbengine.sprites import sprite_atlas
+from smbengine.stats import summarize
+from smbengine.text import text_cache
+
+# The simulation always advances in ticks of 1/FPS seconds. Frames run as
+# fast as they can (up to max_fps), so a frame may take several ticks or
+# none; after a stall at most MAX_CATCH_UP ticks are run in one go and the
+# rest of the backlog is dropped.
+TICK = 1 / FPS
+MAX_CATCH_UP = 5
+
+# Chunks in the procedurally generated run behind each overworld pipe; it
+# finishes like a fixed level once Mario gets near the end
+PIPE_RUN_CHUNKS = 8
+
+
+class OverworldMap:
+    def __init__(self):
+        self.tile_size = 40
+        self.map_width = 20
+        self.map_height = 15
+        self.map_data = []
+        self.player_map_pos = [2, 7]  # Starting position on map
+        self.static_layer = None  # Pre-rendered tiles, rebuilt when map_data changes
+        self.static_source = None
+        self.generate_map()
+        
+    def generate_map(self):
+        # Generate a simple SMB3-style overworld map
+        # 0 = empty, 1 = path, 2 = grass, 3 = water, 4 = castle, 5 = pipe
+        self.map_data = [
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0],
+            [0, 0, 1, 2, 2, 2, 1, 2, 2, 1, 2, 2, 1, 2, 2, 2, 2, 1, 0, 0],
+            [0, 0, 1, 2, 2, 2, 1, 2, 2, 1, 2, 2, 1, 2, 2, 2, 2, 1, 0, 0],
+            [0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+        ]
+        
+        # Add some special tiles (castles, pipes, etc.)
+        self.map_data[7][15] = 4  # Castle
+        self.map_data[7][5] = 5   # Pipe
+        self.map_data[7][11] = 5  # Pipe
+        
+        # Level description behind each enterable tile, in LEVEL_DIR
+        self.level_files = {}
+        for y, row in enumerate(self.map_data):
+            for x, tile in enumerate(row):
+                if tile == 2:
+                    self.level_files[(x, y)] = "1-1.json"
+        self.level_files[(15, 7)] = "castle.json"
+        self.invalidate()
+        
+    def set_tile(self, x, y, tile):
+        self.map_data[y][x] = tile
+        self.invalidate()
+        
+    def invalidate(self):
+        # Call after editing map_data in place so the cached layer is rebuilt
+        self.static_layer = None
+        
+    def is_dirty(self):
+        return self.static_layer is None or self.static_source is not self.map_data
+        
+    def can_move_to(self, x, y):
+        # Check if the position is within bounds and is a path or special tile
+        if 0 <= x < self.map_width and 0 <= y < self.map_height:
+            return self.map_data[y][x] in [1, 2, 4, 5]  # Can move on paths, grass, castles, and pipes
+        return False
+        
+    def is_enterable(self, x, y):
+        return self.map_data[y][x] in [2, 4, 5]  # Grass, castle, or pipe
+        
+    def is_pipe(self, x, y):
+        # Pipes lead to endless generated runs instead of a fixed level
+        return self.map_data[y][x] == 5
+        
+    def render_static_layer(self):
+        # Draw the overworld map once; it only changes through set_tile,
+        # invalidate or a new map_data list
+        screen = pygame.Surface((self.map_width * self.tile_size, self.map_height * self.tile_size))
+        for y in range(self.map_height):
+            for x in range(self.map_width):
+                rect = pygame.Rect(x * self.tile_size, y * self.tile_size, self.tile_size, self.tile_size)
+                
+                if self.map_data[y][x] == 0:  # Empty/background
+                    pygame.draw.rect(screen, SKY_BLUE, rect)
+                elif self.map_data[y][x] == 1:  # Path
+                    pygame.draw.rect(screen, SAND_YELLOW, rect)
+                elif self.map_data[y][x] == 2:  # Grass
+                    pygame.draw.rect(screen, GRASS_GREEN, rect)
+                elif self.map_data[y][x] == 3:  # Water
+                    pygame.draw.rect(screen, WATER_BLUE, rect)
+                elif self.map_data[y][x] == 4:  # Castle
+                    pygame.draw.rect(screen, CASTLE_GRAY, rect)
+                    # Draw castle details
+                    pygame.draw.rect(screen, BLACK, (x * self.tile_size + 10, y * self.tile_size + 5, 20, 25))
+                    pygame.draw.rect(screen, MARIO_RED, (x * self.tile_size + 15, y * self.tile_size, 10, 5))
+                elif self.map_data[y][x] == 5:  # Pipe
+                    pygame.draw.rect(screen, PIPE_GREEN, rect)
+                
+                # Draw grid lines
+                pygame.draw.rect(screen, BLACK, rect, 1)
+        
+        self.static_layer = display_format(screen)
+        self.static_source = self.map_data
+        
+    def draw_static(self, screen, area=None):
+        if self.is_dirty():
+            self.render_static_layer()
+        if area is None:
+            screen.blit(self.static_layer, (0, 0))
+        else:
+            screen.blit(self.static_layer, area, area)
+            
+    def player_rect(self):
+        return pygame.Rect(
+            self.player_map_pos[0] * self.tile_size + 10,
+            self.player_map_pos[1] * self.tile_size + 10,
+            20, 20
+        )
+        
+    def draw_player(self, screen):
+        pygame.draw.rect(screen, MARIO_RED, self.player_rect())
+        
+    def draw(self, screen):
+        self.draw_static(screen)
+        self.draw_player(screen)
+
+class Game:
+    def __init__(self, recorder=None, replay=None, render_scale=1, dirty_rects=False, max_fps=FPS * 2, capture=None):
+        self.screen = open_window((SCREEN_WIDTH, SCREEN_HEIGHT), "Super Mario Bros 3-style Game")
+        
+        # Levels are drawn into a framebuffer render_scale times smaller than
+        # the window and blown up once per frame; gameplay stays in window pixels
+        if SCREEN_WIDTH % render_scale or SCREEN_HEIGHT % render_scale:
+            raise ValueError(f"render scale {render_scale} does not divide {SCREEN_WIDTH}x{SCREEN_HEIGHT}")
+        self.render_scale = render_scale
+        self.framebuffer = None
+        if render_scale > 1:
+            self.framebuffer = pygame.Surface((SCREEN_WIDTH // render_scale, SCREEN_HEIGHT // render_scale)).convert()
+        sprite_atlas(render_scale)  # build the sprite frames now that the display exists
+        self.terrain_layer = None   # made for each level the first time it is drawn
+        
+        # In dirty-rect mode a level frame with a still camera only restores
+        # and redraws the areas sprites left or entered, from a copy of the
+        # sky and terrain, and pushes just those to the display
+        if dirty_rects and render_scale > 1:
+            raise ValueError("dirty-rect drawing needs a render scale of 1")
+        self.dirty_rects = dirty_rects
+        self.level_background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert() if dirty_rects else None
+        self.level_camera = None         # camera position of level_background; None forces a full redraw
+        self.level_sprite_rects = set()  # sprite_keys of what the screen shows
+        self.clock = pygame.time.Clock()
+        self.max_fps = max_fps  # frame rate cap; 0 for none
+        self.alpha = 1.0        # how far into the next tick this frame is drawn
+        self.running = True
+        self.world = 1
+        self.level = 1
+        self.game_state = "overworld"  # "overworld" or "level"
+        self.overworld_map = OverworldMap()
+        
+        # Input consumed by the next tick, optionally recorded or replayed
+        self.tick_input = NO_INPUT
+        self.overworld_keys = []
+        self.pending_keys = []  # overworld keys pressed since the last tick
+        self.recorder = recorder
+        self.replay = replay
+        self.timings = {"update": [], "draw": []} if replay is not None else None
+        
+        # Seeds every endless run; recordings store it so replays match
+        self.seed = replay.seed if replay is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        if recorder is not None:
+            recorder.seed = self.seed
+        
+        # All level state lives in the headless simulation; levels are built
+        # in the background while the player walks the map
+        self.sim = Simulation()
+        self.level_loader = LevelLoader(self.build_level)
+        
+        # The last few seconds of level states, for rewinding with R
+        self.rewind = RewindBuffer()
+        
+        # Load fonts for SNES-style HUD
+        self.hud_font_large = load_font('Arial', 24, bold=True)
+        self.hud_font_small = load_font('Arial', 18, bold=True)
+        self.hud_font_tiny = load_font('Arial', 14, bold=True)
+        self.instruction_font = load_font(None, 24)
+        
+        # The HUD bars are painted once and only changed fields are redrawn
+        self.snes_hud = self.build_snes_hud()
+        self.overworld_hud = self.build_overworld_hud()
+        
+        # HUD text hangs a little below the bar, so its dirty area does too
+        self.hud_rect = pygame.Rect(0, 0, SCREEN_WIDTH, 20 + self.hud_font_large.get_height())
+        self.instruction_rect = pygame.Rect(0, SCREEN_HEIGHT - 30, SCREEN_WIDTH, 30)
+        
+        # What the overworld screen currently shows; None forces a full redraw
+        self.overworld_marker = None
+        
+        # Per-phase frame timings, toggled with F3; sim.profiler is None when off
+        self.profiler = FrameProfiler()
+        self.profiler_font = load_font(None, 18)
+        
+        # (path, format, policy) to record every presented frame to, or None
+        self.capture = None
+        if capture is not None:
+            path, format, policy = capture
+            self.capture = FrameCapture(path, self.screen.get_size(), format, policy, like=self.screen)
+        
+    def handle_events(self):
+        # Window events, once per frame; the keyboard is ignored in a replay
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    self.toggle_profiler()
+                elif self.replay is None and self.game_state == "overworld":
+                    self.pending_keys.append(event.key)
+                    
+    def read_input(self):
+        # Gather the input for the next tick; overworld keys pressed during
+        # a frame go to the first tick after it
+        if self.replay is not None:
+            if self.replay.done():
+                self.running = False
+                return
+            self.tick_input, self.overworld_keys = self.replay.next()
+        else:
+            self.tick_input = InputState.from_keys(pygame.key.get_pressed())
+            self.overworld_keys, self.pending_keys = self.pending_keys, []
+        if self.recorder is not None:
+            self.recorder.record(self.tick_input, self.overworld_keys)
+            
+    def toggle_profiler(self):
+        if self.sim.profiler is None:
+            self.sim.profiler = self.profiler
+        else:
+            self.sim.profiler = None
+        # The overworld only repaints what changed, so clear the graph with a full redraw
+        self.overworld_marker = None
+        self.level_camera = None
+        
+    def handle_overworld_key(self, key):
+        # Overworld movement
+        if key == pygame.K_RIGHT:
+            new_x = self.overworld_map.player_map_pos[0] + 1
+            if self.overworld_map.can_move_to(new_x, self.overworld_map.player_map_pos[1]):
+                self.overworld_map.player_map_pos[0] = new_x
+        elif key == pygame.K_LEFT:
+            new_x = self.overworld_map.player_map_pos[0] - 1
+            if self.overworld_map.can_move_to(new_x, self.overworld_map.player_map_pos[1]):
+                self.overworld_map.player_map_pos[0] = new_x
+        elif key == pygame.K_UP:
+            new_y = self.overworld_map.player_map_pos[1] - 1
+            if self.overworld_map.can_move_to(self.overworld_map.player_map_pos[0], new_y):
+                self.overworld_map.player_map_pos[1] = new_y
+        elif key == pygame.K_DOWN:
+            new_y = self.overworld_map.player_map_pos[1] + 1
+            if self.overworld_map.can_move_to(self.overworld_map.player_map_pos[0], new_y):
+                self.overworld_map.player_map_pos[1] = new_y
+        elif key == pygame.K_RETURN:
+            # Enter level if on a special tile
+            tile_x, tile_y = self.overworld_map.player_map_pos
+            if self.overworld_map.is_pipe(tile_x, tile_y):
+                self.game_state = "level"
+                self.sim.setup_level(EndlessLevel(self.rng.randrange(1 << 32), length=PIPE_RUN_CHUNKS))
+                self.rewind.clear()
+            elif self.overworld_map.is_enterable(tile_x, tile_y):
+                self.game_state = "level"
+                self.sim.setup_level(self.level_loader.get(self.overworld_map.level_files[(tile_x, tile_y)]))
+                self.rewind.clear()
+                
+        # Start building the level under the player before ENTER
+        self.preload_level()
+                    
+    def build_level(self, name):
+        # Runs on the level loader thread; compiles the description if needed
+        return open_level(os.path.join(LEVEL_DIR, name))
+        
+    def preload_level(self):
+        tile_x, tile_y = self.overworld_map.player_map_pos
+        if self.overworld_map.is_enterable(tile_x, tile_y) and not self.overworld_map.is_pipe(tile_x, tile_y):
+            self.level_loader.preload(self.overworld_map.level_files[(tile_x, tile_y)])
+            
+    def update(self):
+        for key in self.overworld_keys:
+            if self.game_state == "overworld":
+                self.handle_overworld_key(key)
+                
+        if self.game_state == "level":
+            if self.sim.profiler is not None:
+                self.sim.profiler.lap("update")
+            if self.tick_input.rewind:
+                # Holding the rewind key steps back one tick per tick
+                state = self.rewind.pop()
+                if state is not None:
+                    restore(self.sim, state)
+            else:
+                self.rewind.push(self.sim)
+                self.sim.tick(self.tick_input)
+            
+            if self.sim.status == "complete":
+                self.game_state = "overworld"
+                # Reset Mario position on map
+                self.overworld_map.player_map_pos[0] += 1
+                self.preload_level()
+            elif self.sim.status == "game_over":
+                self.game_state = "overworld"
+                self.preload_level()
+            
+    def build_snes_hud(self):
+        # Draw SNES-style HUD background
+        hud_height = 40
+        hud = HudLayer(SCREEN_WIDTH, hud_height)
+        pygame.draw.rect(hud.base, HUD_BLUE, (0, 0, SCREEN_WIDTH, hud_height))
+        pygame.draw.rect(hud.base, BLACK, (0, hud_height-2, SCREEN_WIDTH, 2))  # Separator line
+        
+        # World info
+        hud.add_label(self.hud_font_small, "WORLD", WHITE, (20, 5))
+        hud.add_field("world", self.hud_font_large, (25, 20))
+        
+        # Lives with Mario icon
+        pygame.draw.rect(hud.base, MARIO_RED, (120, 15, 12, 12))  # Simple Mario icon
+        hud.add_field("lives", self.hud_font_large, (140, 18))
+        
+        # Coins with coin icon
+        pygame.draw.ellipse(hud.base, COIN_YELLOW, (220, 18, 16, 16))
+        hud.add_field("coins", self.hud_font_large, (240, 18))
+        
+        # Score
+        hud.add_label(self.hud_font_small, "SCORE", WHITE, (SCREEN_WIDTH - 150, 5))
+        hud.add_field("score", self.hud_font_large, (SCREEN_WIDTH - 150, 20))
+        
+        # Time
+        hud.add_label(self.hud_font_small, "TIME", WHITE, (SCREEN_WIDTH - 80, 5))
+        hud.add_field("time", self.hud_font_large, (SCREEN_WIDTH - 80, 20))
+        
+        hud.reset()
+        return hud
+        
+    def build_overworld_hud(self):
+        # Draw SNES-style HUD for overworld
+        hud_height = 40
+        hud = HudLayer(SCREEN_WIDTH, hud_height)
+        pygame.draw.rect(hud.base, HUD_BLUE, (0, 0, SCREEN_WIDTH, hud_height))
+        pygame.draw.rect(hud.base, BLACK, (0, hud_height-2, SCREEN_WIDTH, 2))  # Separator line
+        
+        # World map title
+        hud.add_label(self.hud_font_large, "WORLD MAP", HUD_GOLD, (SCREEN_WIDTH // 2 - 60, 10))
+        
+        # Lives with Mario icon
+        pygame.draw.rect(hud.base, MARIO_RED, (20, 15, 12, 12))  # Simple Mario icon
+        hud.add_field("lives", self.hud_font_large, (40, 18))
+        
+        # Coins with coin icon
+        pygame.draw.ellipse(hud.base, COIN_YELLOW, (120, 18, 16, 16))
+        hud.add_field("coins", self.hud_font_large, (140, 18))
+        
+        # Score
+        hud.add_label(self.hud_font_small, "SCORE", WHITE, (SCREEN_WIDTH - 150, 5))
+        hud.add_field("score", self.hud_font_large, (SCREEN_WIDTH - 150, 20))
+        
+        hud.reset()
+        return hud
+        
+    def update_snes_hud(self):
+        # Fields re-render only when their value changes
+        hud = self.snes_hud
+        hud.set("world", f"{self.world}-{self.level}", HUD_GOLD)
+        hud.set("lives", f"×{self.sim.lives}", WHITE)
+        hud.set("coins", f"×{self.sim.coins}", WHITE)
+        hud.set("score", f"{self.sim.score:06d}", HUD_GOLD)
+        hud.set("time", f"{int(self.sim.time_left):03d}", HUD_RED if self.sim.time_left < 100 else WHITE)
+        
+    def update_overworld_hud(self):
+        hud = self.overworld_hud
+        changed = hud.set("lives", f"×{self.sim.lives}", WHITE)
+        changed |= hud.set("coins", f"×{self.sim.coins}", WHITE)
+        changed |= hud.set("score", f"{self.sim.score:06d}", HUD_GOLD)
+        return changed
+        
+    def draw_snes_hud(self, screen):
+        self.update_snes_hud()
+        return self.snes_hud.draw(screen)
+        
+    def draw_overworld_hud(self, screen):
+        return self.overworld_hud.draw(screen)
+        
+    def draw(self):
+        profiler = self.sim.profiler
+        if self.game_state == "overworld":
+            # Only push the parts of the map screen that changed
+            self.level_camera = None
+            dirty = self.draw_overworld()
+            if profiler is not None:
+                profiler.lap("draw")
+                dirty.append(self.draw_profiler())
+                profiler.lap("overlay")
+            if dirty:
+                pygame.display.update(dirty)
+            if profiler is not None:
+                profiler.lap("flip")
+            return
+        
+        self.overworld_marker = None
+        dirty = self.draw_level()
+        if profiler is not None:
+            profiler.lap("draw")
+            overlay = self.draw_profiler()
+            if dirty is not None:
+                dirty.append(overlay)
+            profiler.lap("overlay")
+        if dirty is None:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        if profiler is not None:
+            profiler.lap("flip")
+        
+    def draw_profiler(self):
+        # Frame graph just under the right end of the HUD bar
+        pos = (SCREEN_WIDTH - self.profiler.capacity - 10, self.hud_rect.bottom + 4)
+        return self.profiler.draw(self.screen, pos, self.profiler_font)
+        
+    def draw_overworld(self):
+        world = self.overworld_map
+        marker = world.player_rect()
+        hud_changed = self.update_overworld_hud()
+        
+        # Full redraw when the overworld was just entered or the map changed
+        if self.overworld_marker is None or world.is_dirty():
+            self.screen.fill(SKY_BLUE)
+            world.draw(self.screen)
+            
+            # Draw SNES-style HUD
+            self.draw_overworld_hud(self.screen)
+            self.draw_instructions()
+            self.overworld_marker = marker
+            return [self.screen.get_rect()]
+        
+        # Otherwise repaint only the changed regions from the cached map layer
+        dirty = []
+        if marker != self.overworld_marker:
+            dirty.append(self.overworld_marker)
+            dirty.append(marker)
+        if hud_changed:
+            dirty.append(self.hud_rect)
+        if not dirty:
+            return dirty
+        
+        for rect in dirty:
+            world.draw_static(self.screen, rect)
+        world.draw_player(self.screen)
+        if self.hud_rect.collidelist(dirty) != -1:
+            self.draw_overworld_hud(self.screen)
+            dirty.append(self.hud_rect)
+        if self.instruction_rect.collidelist(dirty) != -1:
+            self.draw_instructions()
+            
+        self.overworld_marker = marker
+        return dirty
+        
+    def draw_instructions(self):
+        instruction_text = text_cache.render(self.instruction_font, "Use arrow keys to move, ENTER to enter level", WHITE)
+        self.screen.blit(instruction_text, (SCREEN_WIDTH // 2 - 180, SCREEN_HEIGHT - 30))
+        
+    def draw_level(self):
+        # Returns the areas to push to the display, or None when the whole
+        # frame was redrawn
+        scale = self.render_scale
+        screen = self.screen if self.framebuffer is None else self.framebuffer
+        sim = self.sim
+        if self.terrain_layer is None or self.terrain_layer.terrain is not sim.terrain:
+            self.terrain_layer = TerrainLayer(sim.terrain, scale)
+            self.level_camera = None
+        camera_x = sim.view_x(self.alpha)
+        sprites = self.level_sprites(camera_x)
+        if self.dirty_rects and self.level_camera == camera_x:
+            return self.redraw_level(sprites)
+        
+        # Platforms come pre-rendered from the level's terrain layer
+        screen.fill(SKY_BLUE)
+        self.terrain_layer.draw(screen, camera_x)
+        if self.dirty_rects:
+            self.level_background.blit(screen, (0, 0))
+            self.level_camera = camera_x
+            self.level_sprite_rects = self.sprite_keys(sprites)
+        
+        # Every sprite is a frame of the same atlas, so they all go out in one blits call
+        screen.blits(sprites, False)
+        
+        # Draw SNES-style HUD
+        if self.framebuffer is None:
+            self.draw_snes_hud(screen)
+            return None
+        self.update_snes_hud()
+        self.snes_hud.draw_scaled(screen, scale)
+        
+        # One nearest-neighbour upscale straight into the window
+        pygame.transform.scale(screen, (SCREEN_WIDTH, SCREEN_HEIGHT), self.screen)
+        return None
+        
+    def redraw_level(self, sprites):
+        # Same camera as the last frame: only sprites that moved or changed
+        # frame need their old and new areas restored and redrawn
+        current = self.sprite_keys(sprites)
+        dirty = []
+        for rect in {key[:4] for key in current ^ self.level_sprite_rects}:
+            rect = self.screen.get_rect().clip(rect)
+            if rect:
+                self.screen.blit(self.level_background, rect, rect)
+                dirty.append(rect)
+        self.level_sprite_rects = current
+        
+        # Redrawing every sprite keeps overlaps in order; only dirty areas are shown
+        if dirty:
+            self.screen.blits(sprites, False)
+        return dirty + self.draw_snes_hud(self.screen)
+        
+    def sprite_keys(self, sprites):
+        # Screen area plus atlas frame of each sprite, so a coin turning in
+        # place counts as a change too
+        return {tuple(pygame.Rect(pos, area.size)) + area.topleft for _, pos, area in sprites}
+        
+    def level_sprites(self, camera_x):
+        # (surface, position, area) of every visible coin, Goomba and Mario,
+        # with the moving ones interpolated by alpha
+        scale = self.render_scale
+        alpha = self.alpha
+        sim = self.sim
+        sprites = []
+        coins = sim.level_coins
+        if sim.batched(coins):
+            # Spin widths for every coin in one NumPy pass
+            for coin, width in zip(coins.handles, batch.coin_widths(coins).tolist()):
+                sprites.append(coin.sprite(camera_x, width, scale))
+        else:
+            for coin in coins.handles:
+                sprites.append(coin.sprite(camera_x, scale=scale))
+            
+        for goomba in sim.goombas.handles:
+            sprites.append(goomba.sprite(camera_x, scale, alpha))
+            
+        sprites.append(sim.mario.sprite(camera_x, scale, alpha))
+        return [sprite for sprite in sprites if sprite is not None]
+        
+    def run(self):
+        lag = 0.0  # real time not yet simulated
+        previous = time.perf_counter()
+        while self.running:
+            profiler = self.sim.profiler
+            if profiler is not None:
+                profiler.begin_frame()
+            self.handle_events()
+            if not self.running:
+                break
+            if profiler is not None:
+                profiler.lap("events")
+                
+            start = time.perf_counter()
+            if self.timings is None:
+                lag += start - previous
+                previous = start
+                ticks = min(int(lag * FPS), MAX_CATCH_UP)
+                lag = min(lag - ticks * TICK, TICK)
+                self.alpha = lag * FPS
+            else:
+                # Replays run one tick per frame, uncapped
+                ticks = 1
+            for _ in range(ticks):
+                self.read_input()
+                if not self.running:
+                    break
+                self.update()
+            if not self.running:
+                break
+            if profiler is not None:
+                profiler.lap("update")
+            updated = time.perf_counter()
+            self.draw()
+            if self.capture is not None:
+                self.capture.push(self.screen)
+                if profiler is not None:
+                    profiler.lap("capture")
+            if profiler is not None:
+                profiler.end_frame()
+                
+            if self.timings is None:
+                if self.max_fps:
+                    self.clock.tick(self.max_fps)
+            else:
+                # Replays run uncapped and keep every frame's timings
+                self.timings["update"].append(updated - start)
+                self.timings["draw"].append(time.perf_counter() - updated)
+            
+        self.level_loader.shutdown()
+        if self.capture is not None:
+            self.capture.close()
+            print(f"captured {self.capture.frames} frames to {self.capture.path} ({self.capture.dropped} dropped)")
+        pygame.quit()
+
+def timing_report(timings):
+    frames = [u + d for u, d in zip(timings["update"], timings["draw"])]
+    report = {name: summarize(samples) for name, samples in (("update", timings["update"]), ("draw", timings["draw"]), ("frame", frames))}
+    print(f"replayed {len(frames)} frames in {sum(frames):.2f} s")
+    print(f"{'':8}{'p50':>9}{'p95':>9}{'p99':>9}{'worst':>9}  (ms)")
+    for name, stats in report.items():
+        print(f"{name:8}" + "".join(f"{stats[key] * 1000:9.3f}" for key in ("p50", "p95", "p99", "max")))
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Super Mario Bros 3-style Game")
+    parser.add_argument("--record", metavar="FILE", help="record the input of every tick to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recording uncapped and report frame timings")
+    parser.add_argument("--report", metavar="FILE", help="also write the replay timing report to FILE as JSON")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="start with the frame profiler on (F3 toggles it) and dump the last frames to FILE (.csv or .json)")
+    parser.add_argument("--scale", type=int, default=1, choices=(1, 2, 4, 5),
+                        help="draw levels at 1/SCALE resolution and upscale to the window (default: 1)")
+    parser.add_argument("--max-fps", type=int, default=FPS * 2,
+                        help=f"cap on frames drawn per second, 0 for none; the game itself always runs at {FPS} ticks/s")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="while the camera stands still, only redraw and push the parts of a level that changed")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record every presented frame on a writer thread: raw RGB24 to PATH.rgb, or PNGs into the directory PATH")
+    parser.add_argument("--capture-format", choices=FORMATS, help="override the format picked from PATH")
+    parser.add_argument("--capture-policy", choices=POLICIES, default="drop",
+                        help="when the writer falls behind, skip frames (drop, default) or wait for it (block)")
+    args = parser.parse_args(argv)
+    
+    game = Game(recorder=InputRecorder() if args.record else None,
+                replay=InputReplay.load(args.replay) if args.replay else None,
+                render_scale=args.scale, dirty_rects=args.dirty_rects, max_fps=args.max_fps,
+                capture=(args.capture, args.capture_format, args.capture_policy) if args.capture else None)
+    if args.profile:
+        game.toggle_profiler()
+    game.run()
+    
+    if args.profile:
+        game.profiler.dump(args.profile)
+    if args.record:
+        game.recorder.save(args.record)
+    if game.timings is not None:
+        report = timing_report(game.timings)
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
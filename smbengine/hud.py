@@ -0,0 +1,107 @@
+# Retained HUD bar.
+#
+# The bar, icons and fixed labels are painted once onto a base surface. Each
+# value field is re-rendered onto the bar only when its text or colour
+# changes, so drawing an unchanged HUD is a single blit.
+
+import pygame
+
+from smbengine.render import scale_rect
+from smbengine.text import text_cache
+
+
+class HudField:
+    __slots__ = ("font", "pos", "text", "color", "surface", "rect")
+
+    def __init__(self, font, pos):
+        self.font = font
+        self.pos = pos
+        self.text = None
+        self.color = None
+        self.surface = None
+        self.rect = pygame.Rect(pos, (0, 0))
+
+
+class HudLayer:
+    def __init__(self, width, height):
+        self.rect = pygame.Rect(0, 0, width, height)
+        self.base = pygame.Surface((width, height))     # bar, icons and labels
+        self.surface = pygame.Surface((width, height))  # base plus current field values
+        self.fields = {}
+        self.dirty = []  # changed field areas since the last draw
+        self.scaled = None  # (scale, surface) made by draw_scaled
+
+    def add_field(self, name, font, pos):
+        self.fields[name] = HudField(font, pos)
+
+    def add_label(self, font, text, color, pos):
+        # Labels are fields that are set once and never change
+        name = f"label:{len(self.fields)}"
+        self.add_field(name, font, pos)
+        self.set(name, text, color)
+
+    def reset(self):
+        # Call after painting the base; redraws every field on top of it
+        self.surface.blit(self.base, (0, 0))
+        for field in self.fields.values():
+            if field.surface is not None:
+                self.surface.blit(field.surface, field.pos)
+        self.dirty.append(self.footprint())
+
+    def set(self, name, text, color):
+        field = self.fields[name]
+        if field.text == text and field.color == color:
+            return False
+        
+        old_rect = field.rect
+        field.text = text
+        field.color = color
+        field.surface = text_cache.render(field.font, text, color)
+        field.rect = field.surface.get_rect(topleft=field.pos)
+        
+        # Restore the base under the old and new value, then redraw every
+        # field touching that area so overlapping text keeps its order
+        area = old_rect.union(field.rect)
+        self.surface.blit(self.base, area, area)
+        for other in self.fields.values():
+            clip = other.rect.clip(area)
+            if other.surface is not None and clip:
+                self.surface.blit(other.surface, clip, clip.move(-other.pos[0], -other.pos[1]))
+        self.dirty.append(area)
+        return True
+
+    def footprint(self):
+        # Screen area the HUD covers, including text hanging below the bar
+        return self.rect.unionall([field.rect for field in self.fields.values()])
+
+    def draw(self, screen):
+        screen.blit(self.surface, (0, 0))
+        self.draw_overhang(screen)
+        
+        dirty = self.dirty
+        self.dirty = []
+        return dirty
+        
+    def draw_overhang(self, screen):
+        # Text taller than the bar hangs over whatever is drawn below it
+        height = self.rect.height
+        for field in self.fields.values():
+            if field.rect.bottom > height:
+                overhang = pygame.Rect(0, height - field.pos[1], field.rect.width, field.rect.bottom - height)
+                screen.blit(field.surface, (field.pos[0], height), overhang)
+                
+    def draw_scaled(self, screen, scale):
+        # draw() onto a framebuffer `scale` times smaller. The HUD is shrunk
+        # once whenever a field changes, overhang included, and blitted as is
+        # otherwise; returns the changed areas in framebuffer pixels
+        if self.dirty or self.scaled is None or self.scaled[0] != scale:
+            footprint = self.footprint()
+            full = pygame.Surface(footprint.size, pygame.SRCALPHA)
+            full.blit(self.surface, (0, 0))
+            self.draw_overhang(full)
+            self.scaled = (scale, pygame.transform.scale(full, (footprint.width // scale, footprint.height // scale)))
+        screen.blit(self.scaled[1], (0, 0))
+        
+        dirty = [scale_rect(rect, scale) for rect in self.dirty]
+        self.dirty = []
+        return dirty
@@ -0,0 +1,83 @@
+# Level descriptions and the background level loader.
+#
+# LevelData is the static part of a level: platforms, the rasterised terrain
+# and the coin and Goomba spawn tables. It is never modified during play, so
+# one built level can be handed to the simulation any number of times and
+# each start spawns fresh entities from the tables. Building one, including
+# its pre-rendered platform textures, is done by LevelLoader on a worker
+# thread so entering a level does not stall the frame.
+
+from concurrent.futures import ThreadPoolExecutor
+
+from smbengine.cache import LRUCache
+from smbengine.constants import SCREEN_WIDTH, TILE_SIZE
+from smbengine.render import platform_surface
+from smbengine.tilemap import TileGrid
+
+
+class LevelData:
+    # The camera stops at camera_limit and the level is complete once Mario
+    # passes finish_x (the level is SCREEN_WIDTH * 3 wide)
+    camera_limit = SCREEN_WIDTH * 2
+    finish_x = SCREEN_WIDTH * 2.5
+    
+    def __init__(self, platforms, coin_spawns, goomba_spawns, terrain=None, width=None):
+        self.platforms = platforms
+        self.coin_spawns = coin_spawns      # [(x, y), ...]
+        self.goomba_spawns = goomba_spawns  # [(x, y), ...]
+        if terrain is None:
+            terrain = TileGrid.from_platforms(platforms, TILE_SIZE)
+        self.terrain = terrain
+        if width is not None:
+            self.camera_limit = width - SCREEN_WIDTH
+            self.finish_x = width - SCREEN_WIDTH / 2
+
+    def prerender(self):
+        # Warm the platform texture cache so the first frame only blits
+        for platform in self.platforms:
+            platform_surface(platform.width, platform.height, platform.color, platform.breakable)
+            
+    def start(self, sim):
+        # Called once the simulation has spawned the level; static levels
+        # have nothing more to add
+        pass
+        
+    def stream(self, sim):
+        # Called after every tick; static levels never change
+        pass
+        
+    def stream_state(self):
+        # (first chunk, next chunk, scroll) for snapshots; static levels
+        # have no streaming state
+        return 0, 0, 0.0
+        
+    def restore_stream(self, sim, state):
+        pass
+
+
+class LevelLoader:
+    def __init__(self, build, capacity=4):
+        self.build = build
+        self.levels = LRUCache(capacity)  # key (e.g. level file) -> Future of a LevelData
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-loader")
+
+    def preload(self, key):
+        # Start building in the background unless already built or in flight;
+        # a build that raised is started again rather than raising forever
+        future = self.levels.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            future = self.executor.submit(self._build, key)
+            self.levels.put(key, future)
+        return future
+
+    def get(self, key):
+        # The ready level for key; only blocks if it was not preloaded in time
+        return self.preload(key).result()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _build(self, key):
+        level = self.build(key)
+        level.prerender()
+        return level
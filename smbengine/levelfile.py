@@ -0,0 +1,232 @@
+# Compiled binary level files.
+#
+#   python -m smbengine.levelfile compile levels/1-1.json [...]
+#
+# Levels are written as JSON descriptions:
+#
+#   {"width": 2400,
+#    "platforms": [{"x": 0, "y": 560, "width": 2400, "height": 40,
+#                   "color": [94, 53, 15], "breakable": false}, ...],
+#    "coins": [[300, 350], ...],
+#    "goombas": [[400, 528], ...]}
+#
+# and compiled into .smblvl files laid out for mmap: a fixed header followed
+# by 8-byte aligned sections of platform records, the coin and Goomba spawn
+# tables as float64 (x, y) pairs and the terrain's collision index (the
+# TileGrid cells plus its slot table). Loading maps the file and hands out
+# memoryviews of it, so only the Platform objects are built in Python; the
+# spawn tables and the collision index are used in place.
+#
+# Everything is little-endian, which is also what the views assume.
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from smbengine.constants import BRICK_RED, SCREEN_WIDTH
+from smbengine.entities import Platform
+from smbengine.level import LevelData
+from smbengine.tilemap import TileGrid
+
+# Level descriptions shipped next to the scripts, compiled to .smblvl next
+# to themselves on first use; DEFAULT_LEVEL is the one tools play by default
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "levels")
+DEFAULT_LEVEL = os.path.join(LEVEL_DIR, "1-1.json")
+
+MAGIC = b"SMBLVL"
+VERSION = 1
+
+# magic, version, tile size, level width, platforms, coins, goombas,
+# grid width, grid height, slots, slot indices
+HEADER = "<6sHHiIIIIIII"
+PLATFORM = "<iiiiBBBB"  # x, y, width, height, r, g, b, breakable
+
+EXTENSION = ".smblvl"
+
+
+def aligned(offset):
+    return (offset + 7) & ~7
+
+
+class SpawnTable:
+    # (x, y) spawn positions read straight out of a float64 buffer
+    __slots__ = ("values",)
+
+    def __init__(self, values):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values) // 2
+
+    def __iter__(self):
+        return zip(self.values[0::2], self.values[1::2])
+
+
+class SlotTable:
+    # TileGrid.slots over a compiled index: slot s names the platforms
+    # indices[offsets[s]:offsets[s + 1]]
+    __slots__ = ("offsets", "indices")
+
+    def __init__(self, offsets, indices):
+        self.offsets = offsets
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, slot):
+        return self.indices[self.offsets[slot]:self.offsets[slot + 1]]
+
+
+def read_description(path):
+    with open(path) as f:
+        description = json.load(f)
+    try:
+        platforms = [Platform(int(p["x"]), int(p["y"]), int(p["width"]), int(p["height"]),
+                              tuple(p.get("color", BRICK_RED)), bool(p.get("breakable", False)))
+                     for p in description["platforms"]]
+        coins = [(float(x), float(y)) for x, y in description.get("coins", ())]
+        goombas = [(float(x), float(y)) for x, y in description.get("goombas", ())]
+        width = int(description.get("width", SCREEN_WIDTH * 3))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"{path}: bad level description: {e!r}") from None
+    if width < SCREEN_WIDTH:
+        raise ValueError(f"{path}: level is narrower than the screen")
+    return LevelData(platforms, coins, goombas, width=width)
+
+
+def build_default_level():
+    # The default level straight from its description, without writing a
+    # compiled file next to it
+    return read_description(DEFAULT_LEVEL)
+
+
+def compile_level(level):
+    # The .smblvl bytes for a LevelData
+    grid = level.terrain
+    offsets = array("I", [0])
+    indices = array("I")
+    for slot in grid.slots:
+        indices.extend(slot)
+        offsets.append(len(indices))
+
+    sections = [
+        b"".join(struct.pack(PLATFORM, int(p.x), int(p.y), int(p.width), int(p.height), *p.color[:3], p.breakable)
+                 for p in level.platforms),
+        array("d", [value for spawn in level.coin_spawns for value in spawn]).tobytes(),
+        array("d", [value for spawn in level.goomba_spawns for value in spawn]).tobytes(),
+        array("H", grid.cells).tobytes(),
+        offsets.tobytes(),
+        indices.tobytes(),
+    ]
+    if sys.byteorder != "little":
+        raise RuntimeError("level files can only be compiled on little-endian machines")
+
+    out = bytearray(struct.pack(HEADER, MAGIC, VERSION, grid.tile_size, int(level.camera_limit + SCREEN_WIDTH),
+                                len(level.platforms), len(level.coin_spawns), len(level.goomba_spawns),
+                                grid.width, grid.height, len(grid.slots), len(indices)))
+    for section in sections:
+        out.extend(bytes(aligned(len(out)) - len(out)))
+        out.extend(section)
+    return bytes(out)
+
+
+def compile_file(source, target=None):
+    target = target or os.path.splitext(source)[0] + EXTENSION
+    data = compile_level(read_description(source))
+    # Write a temporary file and rename it over the target, so a process
+    # that maps the level meanwhile sees the old file or the new one, never
+    # a half-written one
+    fd, temporary = tempfile.mkstemp(suffix=EXTENSION, dir=os.path.dirname(target) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(temporary, 0o644)  # mkstemp creates it private
+        os.replace(temporary, target)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return target
+
+
+def ensure_compiled(source):
+    # Path of the compiled level for a JSON description, rebuilding it when
+    # the description is newer
+    target = os.path.splitext(source)[0] + EXTENSION
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source):
+        compile_file(source, target)
+    return target
+
+
+def load_level(path):
+    # A LevelData backed by a memory map of the compiled file
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return parse_level(buffer, path)
+
+
+def parse_level(buffer, name="level"):
+    if sys.byteorder != "little":
+        raise RuntimeError("level files can only be loaded on little-endian machines")
+    view = memoryview(buffer)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{name} is not a compiled level")
+    (_, version, tile_size, width, platform_count, coin_count, goomba_count,
+     grid_width, grid_height, slot_count, index_count) = struct.unpack_from(HEADER, buffer)
+    if version != VERSION:
+        raise ValueError(f"{name} is level format version {version}, expected {VERSION}")
+
+    # Section boundaries, in file order
+    sizes = (platform_count * struct.calcsize(PLATFORM), 16 * coin_count, 16 * goomba_count,
+             2 * grid_width * grid_height, 4 * (slot_count + 1), 4 * index_count)
+    sections = []
+    offset = struct.calcsize(HEADER)
+    for size in sizes:
+        offset = aligned(offset)
+        sections.append(view[offset:offset + size])
+        offset += size
+    if offset > len(view):
+        raise ValueError(f"{name} is truncated")
+    records, coins, goombas, cells, offsets, indices = sections
+
+    platforms = [Platform(x, y, w, h, (r, g, b), bool(breakable))
+                 for x, y, w, h, r, g, b, breakable in struct.iter_unpack(PLATFORM, records)]
+    terrain = TileGrid.from_index(grid_width, grid_height, tile_size, cells.cast("H"),
+                                  SlotTable(offsets.cast("I"), indices.cast("I")), platforms)
+    level = LevelData(platforms, SpawnTable(coins.cast("d")), SpawnTable(goombas.cast("d")), terrain, width)
+    level.buffer = buffer  # the views above stay valid while the level is alive
+    return level
+
+
+def open_level(path):
+    # Load a compiled level, compiling a JSON description first if given one
+    if path.endswith(".json"):
+        path = ensure_compiled(path)
+    return load_level(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m smbengine.levelfile")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("compile", help="compile JSON level descriptions")
+    p.add_argument("sources", nargs="+")
+    p.add_argument("-o", "--output", help="output file (only with a single source)")
+
+    args = parser.parse_args(argv)
+    if args.output and len(args.sources) > 1:
+        parser.error("-o needs exactly one source")
+    for source in args.sources:
+        target = compile_file(source, args.output)
+        level = load_level(target)
+        print(f"{source} -> {target}: {len(level.platforms)} platforms, {len(level.coin_spawns)} coins, "
+              f"{len(level.goomba_spawns)} goombas, {os.path.getsize(target)} bytes")
+
+
+if __name__ == "__main__":
+    main()
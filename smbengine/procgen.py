@@ -0,0 +1,215 @@
+# Endless procedurally generated levels.
+#
+# An EndlessLevel is cut into CHUNK_WIDTH-wide chunks. Each chunk is made
+# from (seed, chunk index) alone, so a seed always produces the same level.
+# Chunks are generated on a worker thread a couple of chunks ahead of the
+# camera and attached to the simulation as the camera reaches them; chunks
+# that fall behind the camera are evicted together with their coins and
+# Goombas. Like in the original Super Mario Bros. the camera never scrolls
+# back, so an evicted chunk is never needed again. Memory and per-tick work
+# depend only on the handful of live chunks, not on the distance travelled.
+#
+# Attaching happens at a camera position, never "when the worker is done":
+# if a chunk is late the tick waits for it, so runs are still deterministic
+# and replayable.
+#
+# Given a length in chunks, a level stops generating there and can be
+# finished like a fixed level; the overworld pipes start runs like that.
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from smbengine.constants import BRICK_RED, SCREEN_HEIGHT, SCREEN_WIDTH, TILE_SIZE
+from smbengine.entities import Goomba, Platform
+from smbengine.tilemap import TileGrid
+
+CHUNK_WIDTH = SCREEN_WIDTH
+GROUND_TOP = SCREEN_HEIGHT - 40
+GROUND_COLOR = (94, 53, 15)
+
+chunk_executor = None  # shared worker thread, created on first use
+
+
+class Chunk:
+    __slots__ = ("index", "platforms", "coin_spawns", "goomba_spawns", "grid")
+
+    def __init__(self, index, platforms, coin_spawns, goomba_spawns):
+        self.index = index
+        self.platforms = platforms
+        self.coin_spawns = coin_spawns
+        self.goomba_spawns = goomba_spawns
+        self.grid = TileGrid.from_platforms(platforms, TILE_SIZE, index * CHUNK_WIDTH)
+
+
+def generate_chunk(seed, index):
+    rng = random.Random(f"{seed}/{index}")
+    left = index * CHUNK_WIDTH
+    platforms = [Platform(left, GROUND_TOP, CHUNK_WIDTH, 40, GROUND_COLOR)]
+    coins = []
+    goombas = []
+
+    # Floating platforms low enough to reach from the ground or from each
+    # other, each with a row of coins above it
+    x = left + rng.randrange(0, 160, TILE_SIZE)
+    while True:
+        width = rng.choice((64, 96, 128, 160, 200))
+        if x + width > left + CHUNK_WIDTH:
+            break
+        y = rng.choice((300, 350, 400, 450))
+        platforms.append(Platform(x, y, width, 20, BRICK_RED, rng.random() < 0.5))
+        if rng.random() < 0.6:
+            coins.extend((cx, y - 50) for cx in range(x + 8, x + width - 16, 40))
+        x += width + rng.randrange(64, 256, TILE_SIZE)
+
+    # The first chunk is where Mario starts, so keep it free of enemies
+    if index > 0:
+        for _ in range(rng.randint(0, 3)):
+            goombas.append((float(left + rng.randrange(0, CHUNK_WIDTH - Goomba.width)), GROUND_TOP - Goomba.height))
+    return Chunk(index, platforms, coins, goombas)
+
+
+def executor():
+    global chunk_executor
+    if chunk_executor is None:
+        chunk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-gen")
+    return chunk_executor
+
+
+class ChunkedTerrain:
+    # Terrain made of per-chunk tile grids. query() matches TileGrid.query:
+    # platforms come back in the order they were added, since chunks are
+    # attached left to right and evicted from the left.
+    def __init__(self):
+        self.chunks = {}  # index -> Chunk, live chunks only
+        self.platforms = []
+        self.batch_columns = None  # rebuilt by batch.platform_columns after changes
+
+    def add_chunk(self, chunk):
+        self.chunks[chunk.index] = chunk
+        self.platforms.extend(chunk.platforms)
+        self.batch_columns = None
+
+    def remove_chunk(self, index):
+        chunk = self.chunks.pop(index)
+        del self.platforms[:len(chunk.platforms)]
+        self.batch_columns = None
+        return chunk
+
+    def clear(self):
+        self.chunks.clear()
+        self.platforms.clear()
+        self.batch_columns = None
+
+    def query(self, x, y, width, height):
+        first = int(x) // CHUNK_WIDTH
+        last = (int(x) + max(int(width), 1) - 1) // CHUNK_WIDTH
+        found = []
+        for index in range(first, last + 1):
+            chunk = self.chunks.get(index)
+            if chunk is not None:
+                found.extend(chunk.grid.query(x, y, width, height))
+        return found
+
+
+class EndlessLevel:
+    # Plays the role of a LevelData for one Simulation at a time; the
+    # platforms list and terrain are updated in place as chunks come and go
+    camera_limit = None
+    finish_x = None
+    coin_spawns = ()    # entities arrive with their chunks
+    goomba_spawns = ()
+
+    def __init__(self, seed, ahead=2, behind=1, generate=generate_chunk, length=None):
+        self.seed = seed
+        self.length = length  # chunks in a run that can be finished; None never ends
+        if length is not None:
+            # Like a LevelData `length * CHUNK_WIDTH` wide
+            self.camera_limit = length * CHUNK_WIDTH - SCREEN_WIDTH
+            self.finish_x = length * CHUNK_WIDTH - SCREEN_WIDTH / 2
+        self.ahead = ahead    # chunks generated past the last attached one
+        self.behind = behind  # chunks kept left of the camera
+        self.generate = generate
+        self.terrain = ChunkedTerrain()
+        self.platforms = self.terrain.platforms
+        self.pending = {}  # index -> Future of a Chunk
+        self.first = 0     # lowest attached chunk
+        self.next = 0      # next chunk to attach
+        self.scroll = 0    # furthest camera position so far
+
+    def prerender(self):
+        pass
+
+    def start(self, sim):
+        self.terrain.clear()
+        self.pending.clear()
+        self.first = 0
+        self.next = 0
+        self.scroll = 0
+        self.stream(sim)
+
+    def stream(self, sim):
+        # The camera only moves forward and Mario cannot leave the screen
+        # to the left
+        if sim.camera_x < self.scroll:
+            sim.camera_x = self.scroll
+        self.scroll = sim.camera_x
+        if sim.mario.x < self.scroll:
+            sim.mario.x = self.scroll
+
+        # Attach everything up to one chunk past the right edge of the screen
+        last = int(self.scroll + SCREEN_WIDTH) // CHUNK_WIDTH + 1
+        end = self.next + self.ahead
+        if self.length is not None:
+            last = min(last, self.length - 1)
+            end = min(end, self.length)
+        while self.next <= last:
+            self.attach(sim, self.next)
+        for index in range(self.next, end):
+            if index not in self.pending:
+                self.pending[index] = executor().submit(self.generate, self.seed, index)
+
+        while self.first < int(self.scroll) // CHUNK_WIDTH - self.behind:
+            self.evict(sim, self.first)
+
+    def attach(self, sim, index):
+        future = self.pending.pop(index, None)
+        chunk = future.result() if future is not None else self.generate(self.seed, index)
+        self.terrain.add_chunk(chunk)
+        for x, y in chunk.coin_spawns:
+            sim.spawn_coin(x, y)
+        for x, y in chunk.goomba_spawns:
+            sim.spawn_goomba(x, y)
+        self.next = index + 1
+
+    def stream_state(self):
+        return self.first, self.next, self.scroll
+
+    def restore_stream(self, sim, state):
+        # Put back the chunks attached at snapshot time; the snapshot holds
+        # their coins and Goombas, so only the terrain is rebuilt
+        first, end, scroll = state
+        chunks = self.terrain.chunks.copy()
+        self.terrain.clear()
+        for index in range(first, end):
+            chunk = chunks.get(index)
+            if chunk is None:
+                future = self.pending.get(index)
+                chunk = future.result() if future is not None else self.generate(self.seed, index)
+            self.terrain.add_chunk(chunk)
+        self.first = first
+        self.next = end
+        self.scroll = scroll
+
+    def evict(self, sim, index):
+        self.terrain.remove_chunk(index)
+        self.first = index + 1
+
+        # Everything left of the first live chunk goes with it, awake or not
+        edge = self.first * CHUNK_WIDTH
+        for store, grid in ((sim.level_coins, sim.coin_hash), (sim.goombas, sim.goomba_hash)):
+            for entity in store:
+                if entity.x + entity.width <= edge:
+                    grid.remove(entity)
+                    store.remove(entity)
+        sim.coin_pool.discard_before(edge)
+        sim.goomba_pool.discard_before(edge)
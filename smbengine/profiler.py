@@ -0,0 +1,147 @@
+# Per-phase frame profiler.
+#
+# Each frame is split into phases by calling lap(phase) as each one ends;
+# the time since the previous lap is added to that phase. Finished frames go
+# into a fixed-size ring buffer, so a long session costs no more memory than
+# a short one. When profiling is off the callers hold None instead of a
+# profiler, so the only cost left is an `is not None` check per phase.
+
+import csv
+import json
+from array import array
+from time import perf_counter
+
+import pygame
+
+from smbengine.constants import BLACK, FPS, WHITE
+from smbengine.stats import summarize
+
+PHASES = ("events", "update", "mario", "entities", "collisions", "camera", "draw", "overlay", "flip", "capture")
+
+PHASE_COLORS = {
+    "events": (160, 160, 160),
+    "update": (255, 255, 255),
+    "mario": (255, 60, 60),
+    "entities": (255, 160, 40),
+    "collisions": (255, 230, 60),
+    "camera": (120, 220, 80),
+    "draw": (80, 160, 255),
+    "overlay": (150, 100, 255),
+    "flip": (40, 220, 220),
+    "capture": (255, 120, 200),
+}
+
+GRAPH_HEIGHT = 48
+LABEL_INTERVAL = 30  # frames between refreshes of the overlay text
+
+
+class FrameProfiler:
+    def __init__(self, phases=PHASES, capacity=240, budget=1 / FPS):
+        self.phases = tuple(phases)
+        self.slots = {name: i for i, name in enumerate(self.phases)}
+        self.capacity = capacity
+        self.budget = budget  # seconds; the graph's midline
+
+        # capacity rows of one float per phase, overwritten oldest first
+        self.samples = array("d", bytes(8 * capacity * len(self.phases)))
+        self.current = [0.0] * len(self.phases)
+        self.frames = 0
+        self.last = perf_counter()
+
+        # Overlay state: the graph scrolls one column per frame
+        self.graph = None
+        self.graphed = 0
+        self.label = None
+
+    def begin_frame(self):
+        current = self.current
+        for i in range(len(current)):
+            current[i] = 0.0
+        self.last = perf_counter()
+
+    def lap(self, phase):
+        now = perf_counter()
+        self.current[self.slots[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        count = len(self.phases)
+        base = (self.frames % self.capacity) * count
+        samples = self.samples
+        for i, value in enumerate(self.current):
+            samples[base + i] = value
+        self.frames += 1
+
+    def __len__(self):
+        return min(self.frames, self.capacity)
+
+    def rows(self):
+        # (frame number, per-phase seconds) for the buffered frames, oldest first
+        count = len(self.phases)
+        for frame in range(self.frames - len(self), self.frames):
+            base = (frame % self.capacity) * count
+            yield frame, self.samples[base:base + count]
+
+    def summary(self):
+        # Per-phase and whole-frame statistics in milliseconds
+        columns = {name: [] for name in self.phases}
+        totals = []
+        for _, row in self.rows():
+            for name, value in zip(self.phases, row):
+                columns[name].append(value * 1000)
+            totals.append(sum(row) * 1000)
+        report = {name: summarize(values) for name, values in columns.items()}
+        report["frame"] = summarize(totals)
+        return report
+
+    def dump(self, path):
+        # JSON when the file name says so, CSV (milliseconds per phase) otherwise
+        if path.endswith(".json"):
+            frames = [[frame] + [value * 1000 for value in row] for frame, row in self.rows()]
+            with open(path, "w") as f:
+                json.dump({"phases": self.phases, "units": "ms", "summary": self.summary(),
+                           "frames": frames}, f, indent=1)
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame",) + self.phases + ("total",))
+            for frame, row in self.rows():
+                writer.writerow([frame] + [f"{value * 1000:.4f}" for value in row] + [f"{sum(row) * 1000:.4f}"])
+
+    def draw(self, screen, pos, font):
+        # Stacked per-phase bar graph of the recent frames with the mean and
+        # worst frame time underneath; returns the area drawn
+        if self.graph is None:
+            self.graph = pygame.Surface((self.capacity, GRAPH_HEIGHT))
+            self.graph.fill(BLACK)
+            self.graphed = max(0, self.frames - self.capacity)
+
+        # Scroll in the frames finished since the last draw
+        graph = self.graph
+        count = len(self.phases)
+        scale = GRAPH_HEIGHT / (2 * self.budget)
+        right = self.capacity - 1
+        for frame in range(max(self.graphed, self.frames - self.capacity), self.frames):
+            graph.scroll(-1, 0)
+            graph.fill(BLACK, (right, 0, 1, GRAPH_HEIGHT))
+            bottom = GRAPH_HEIGHT
+            base = (frame % self.capacity) * count
+            for i, name in enumerate(self.phases):
+                height = int(self.samples[base + i] * scale + 0.5)
+                if height and bottom > 0:
+                    graph.fill(PHASE_COLORS.get(name, WHITE), (right, bottom - height, 1, height))
+                    bottom -= height
+            graph.set_at((right, GRAPH_HEIGHT // 2), WHITE)  # frame budget
+        self.graphed = self.frames
+
+        if self.label is None or self.frames % LABEL_INTERVAL == 0:
+            totals = [sum(row) * 1000 for _, row in self.rows()] or [0.0]
+            text = f"frame {sum(totals) / len(totals):.2f} ms  worst {max(totals):.2f} ms"
+            self.label = font.render(text, True, WHITE)
+
+        x, y = pos
+        rect = pygame.Rect(x, y, self.capacity, GRAPH_HEIGHT + self.label.get_height())
+        screen.fill(BLACK, rect)
+        screen.blit(graph, pos)
+        screen.blit(self.label, (x, y + GRAPH_HEIGHT))
+        return rect
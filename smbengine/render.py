@@ -0,0 +1,111 @@
+# Pre-rendered surfaces for level drawing.
+#
+# Drawing a breakable platform dot by dot costs one draw call per 4x4 cell,
+# so every distinct platform look is rendered once, converted to the display
+# format when a display exists, and blitted from then on.
+#
+# Draw methods work in window pixels. Given a scale above 1 they draw onto a
+# low-resolution framebuffer that many times smaller instead, mapping their
+# rectangles through scale_rect; gameplay coordinates never change.
+#
+# A TerrainLayer goes one step further for the static platforms of a level:
+# they are rendered into screen-wide transparent strips, so a frame blits
+# the one or two strips under the camera however many platforms the level
+# has.
+
+import pygame
+
+from smbengine.cache import LRUCache
+from smbengine.constants import SCREEN_HEIGHT, SCREEN_WIDTH
+
+# Levels rarely have more than a few dozen distinct platform sizes; the bound
+# keeps odd levels from growing the cache without limit
+platform_cache = LRUCache(64)
+
+
+def display_format(surface):
+    # Match the display pixel format so blits skip per-pixel conversion;
+    # headless runs have no display to match and keep the surface as is
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return surface.convert()
+    return surface
+
+
+def render_platform(width, height, color, breakable):
+    surface = pygame.Surface((width, height))
+    surface.fill(color)
+    
+    # Add brick pattern if it's a breakable brick
+    if breakable:
+        highlight = (min(color[0] + 20, 255), min(color[1] + 20, 255), min(color[2] + 20, 255))
+        for i in range(0, width, 4):
+            for j in range(0, height, 4):
+                surface.fill(highlight, (i, j, 2, 2))
+    return display_format(surface)
+
+
+def platform_surface(width, height, color, breakable, scale=1):
+    key = (width, height, tuple(color), breakable, scale)
+    surface = platform_cache.get(key)
+    if surface is None:
+        if scale == 1:
+            surface = render_platform(width, height, color, breakable)
+        else:
+            # Nearest-neighbour shrink of the full-size texture, rounded up
+            # so neighbouring platforms still meet
+            full = platform_surface(width, height, color, breakable)
+            surface = pygame.transform.scale(full, (-(-width // scale), -(-height // scale)))
+        platform_cache.put(key, surface)
+    return surface
+
+
+def scale_rect(rect, scale):
+    # A window-pixel rect on a framebuffer `scale` times smaller. Edges are
+    # mapped rather than sizes so touching rects keep touching, and nothing
+    # shrinks below one pixel
+    if scale == 1:
+        return rect
+    x, y, width, height = rect
+    left = int(x // scale)
+    top = int(y // scale)
+    return (left, top, max(1, int((x + width) // scale) - left), max(1, int((y + height) // scale) - top))
+
+
+def scale_point(x, y, scale):
+    if scale == 1:
+        return x, y
+    return int(x // scale), int(y // scale)
+
+
+class TerrainLayer:
+    # Platforms of one level in SCREEN_WIDTH-wide strips, rendered the first
+    # time the camera reaches them. The camera sees at most two strips at
+    # once, so a few strips are enough to scroll either way. Strips are
+    # colour-keyed with RLE, which makes their empty sky nearly free to blit.
+    strip_width = SCREEN_WIDTH
+    colorkey = (255, 0, 255)
+
+    def __init__(self, terrain, scale=1, capacity=4):
+        self.terrain = terrain  # TileGrid or anything else with query()
+        self.scale = scale
+        self.strips = LRUCache(capacity)
+
+    def strip(self, index):
+        surface = self.strips.get(index)
+        if surface is None:
+            scale = self.scale
+            left = index * self.strip_width
+            surface = pygame.Surface((self.strip_width // scale, SCREEN_HEIGHT // scale))
+            surface.fill(self.colorkey)
+            for platform in self.terrain.query(left, 0, self.strip_width, SCREEN_HEIGHT):
+                platform.draw(surface, left, scale)
+            surface = display_format(surface)
+            surface.set_colorkey(self.colorkey, pygame.RLEACCEL)
+            self.strips.put(index, surface)
+        return surface
+
+    def draw(self, screen, camera_x):
+        first = int(camera_x) // self.strip_width
+        last = (int(camera_x) + SCREEN_WIDTH - 1) // self.strip_width
+        for index in range(first, last + 1):
+            screen.blit(self.strip(index), scale_point(index * self.strip_width - camera_x, 0, self.scale))
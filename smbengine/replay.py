@@ -0,0 +1,91 @@
+# Deterministic input recording and replay.
+#
+# A recording is the exact input the game consumed on every tick: the held
+# InputState passed to the simulation and the overworld key presses handled
+# that tick. Since the game is deterministic given those, replaying a file
+# reproduces a session frame for frame, which makes it a fixed workload for
+# timing comparisons.
+#
+# File layout: b"SMBREC", a version byte, the tick count and the game's
+# random seed as little-endian uint32s, then a zlib stream with one byte per tick (input bits, plus 0x80
+# when overworld keys follow as a count byte and one code byte per key).
+
+import struct
+import zlib
+
+import pygame
+
+from smbengine.controls import InputState
+
+MAGIC = b"SMBREC"
+VERSION = 2
+HEADER = "<BII"
+HAS_KEYS = 0x80
+
+# Only these keys do anything on the overworld, so only these are recorded
+OVERWORLD_KEYS = (pygame.K_RIGHT, pygame.K_LEFT, pygame.K_UP, pygame.K_DOWN, pygame.K_RETURN)
+KEY_CODES = {key: code for code, key in enumerate(OVERWORLD_KEYS, 1)}
+
+
+class InputRecorder:
+    def __init__(self, seed=0):
+        self.data = bytearray()
+        self.ticks = 0
+        self.seed = seed  # anything random in the session derives from this
+
+    def record(self, inputs, keys=()):
+        codes = [KEY_CODES[key] for key in keys if key in KEY_CODES]
+        if codes:
+            self.data.append(inputs.bits() | HAS_KEYS)
+            self.data.append(len(codes))
+            self.data.extend(codes)
+        else:
+            self.data.append(inputs.bits())
+        self.ticks += 1
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(MAGIC + struct.pack(HEADER, VERSION, self.ticks, self.seed))
+            f.write(zlib.compress(bytes(self.data), 9))
+
+
+class InputReplay:
+    def __init__(self, data, ticks, seed=0):
+        self.data = data
+        self.ticks = ticks
+        self.seed = seed
+        self.offset = 0
+        self.tick = 0
+        self.states = [InputState.from_bits(bits) for bits in range(16)]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            blob = f.read()
+        header = len(MAGIC) + struct.calcsize(HEADER)
+        if blob[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an input recording")
+        version = blob[len(MAGIC)]
+        if version != VERSION:
+            raise ValueError(f"{path} is recording version {version}, expected {VERSION}")
+        _, ticks, seed = struct.unpack_from(HEADER, blob, len(MAGIC))
+        return cls(zlib.decompress(blob[header:]), ticks, seed)
+
+    def __len__(self):
+        return self.ticks
+
+    def done(self):
+        return self.tick >= self.ticks
+
+    def next(self):
+        # (InputState, overworld keys) for the next tick
+        data = self.data
+        byte = data[self.offset]
+        self.offset += 1
+        keys = ()
+        if byte & HAS_KEYS:
+            count = data[self.offset]
+            keys = tuple(OVERWORLD_KEYS[code - 1] for code in data[self.offset + 1:self.offset + 1 + count])
+            self.offset += 1 + count
+        self.tick += 1
+        return self.states[byte & 0x0F], keys
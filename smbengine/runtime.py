@@ -0,0 +1,32 @@
+# Lazy start-up of the pygame subsystems the engine uses.
+#
+# pygame.init() brings up every SDL subsystem pygame was built with (audio,
+# joysticks and so on), which the game never touches. The engine only needs
+# the display and the font module, and only once a window is opened or text
+# is rendered, so these start each one on first use. Simulations, level
+# tools and the benchmarks import the engine without starting either.
+
+import pygame
+
+
+def init_display():
+    if not pygame.display.get_init():
+        pygame.display.init()
+
+
+def init_font():
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+
+def open_window(size, caption):
+    init_display()
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(caption)
+    return screen
+
+
+def load_font(name, size, bold=False):
+    # pygame.font.SysFont, starting the font module the first time
+    init_font()
+    return pygame.font.SysFont(name, size, bold=bold)
@@ -0,0 +1,298 @@
+# Headless simulation core for one level.
+#
+# Simulation owns everything the game logic needs for a level: Mario, the
+# terrain, coins and Goombas, score, lives, the timer and the camera. It never
+# opens a window or reads the keyboard; each tick takes an explicit
+# InputState, so tools can step it as fast as the CPU allows. Game wraps one
+# of these and adds the overworld, the window and the drawing.
+
+from smbengine import batch
+from smbengine.active import SleepPool
+from smbengine.collide import sweep_overlaps
+from smbengine.constants import FPS, SCREEN_WIDTH, TILE_SIZE
+from smbengine.controls import NO_INPUT
+from smbengine.entities import Coin, Goomba, Mario
+from smbengine.levelfile import build_default_level
+from smbengine.spatial import SpatialHash
+from smbengine.store import EntityStore
+from smbengine.tilemap import TileGrid
+
+
+# Ticks between passes that put far away entities to sleep
+SLEEP_INTERVAL = 15
+
+
+class Simulation:
+    def __init__(self, level=None, tick_rate=FPS):
+        self.score = 0
+        self.lives = 3
+        self.coins = 0
+        self.time_left = 300  # 5 minutes in seconds
+        self.camera_x = 0
+        self.ticks = 0
+        self.status = "playing"  # "playing", "complete" or "game_over"
+        
+        # Ticks per second of game time. Movement is tuned for FPS; at lower
+        # rates every tick covers dt frames of it, which swept collisions
+        # with platforms, coins and Goombas keep exact enough for fast
+        # headless runs
+        self.tick_rate = tick_rate
+        self.dt = FPS / tick_rate
+        
+        # Stores at least this big are updated with NumPy batches when NumPy
+        # is installed; None always uses the per-object updates. The
+        # crossover comes from `python -m smbengine.bench batch`
+        self.batch_threshold = 16
+        
+        # FrameProfiler timing the phases of each tick, or None when off
+        self.profiler = None
+        
+        # Coins and Goombas further than this beyond either screen edge
+        # sleep until the camera gets near; None simulates the whole level
+        self.active_margin = 256
+        
+        # Create game objects for level
+        self.mario = Mario(100, 300)
+        self.prev_camera_x = 0  # camera at the start of the last tick, for interpolation
+        self.level_data = None
+        self.platforms = []
+        
+        # Coins and Goombas live in column stores that only hold live ones
+        self.level_coins = EntityStore(Coin)
+        self.goombas = EntityStore(Goomba)
+        
+        # Tile grid for static terrain, broadphase grids for the entities
+        # Mario can touch
+        self.terrain = TileGrid(0, 0, TILE_SIZE)
+        self.coin_hash = SpatialHash()
+        self.goomba_hash = SpatialHash()
+        
+        # Entities outside the active region, parked by x
+        self.coin_pool = SleepPool(self.level_coins, self.coin_hash)
+        self.goomba_pool = SleepPool(self.goombas, self.goomba_hash)
+        
+        self.setup_level(level)
+        
+    def setup_level(self, level=None):
+        # Start (or restart) a level; without an argument the current level
+        # is replayed, built synchronously the first time
+        if level is None:
+            level = self.level_data or build_default_level()
+        self.level_data = level
+        
+        # Clear existing objects
+        self.level_coins.clear()
+        self.goombas.clear()
+        self.coin_hash.clear()
+        self.goomba_hash.clear()
+        self.coin_pool.clear()
+        self.goomba_pool.clear()
+        
+        # Reset timer and Mario for new level
+        self.time_left = 300
+        self.status = "playing"
+        self.reset_mario()
+        
+        # Terrain is shared with the level data, entities spawn fresh
+        self.platforms = level.platforms
+        self.terrain = level.terrain
+        for x, y in level.coin_spawns:
+            self.spawn_coin(x, y)
+        for x, y in level.goomba_spawns:
+            self.spawn_goomba(x, y)
+        level.start(self)
+        self.remember_positions()
+        
+    def spawn_coin(self, x, y):
+        if self.is_active(x, self.level_coins.handle_cls.width):
+            coin = self.level_coins.spawn(x=x, y=y)
+            self.coin_hash.insert(coin, coin.x, coin.y, coin.width, coin.height)
+        else:
+            self.coin_pool.park_new(x=x, y=y)
+        
+    def spawn_goomba(self, x, y):
+        if self.is_active(x, self.goombas.handle_cls.width):
+            goomba = self.goombas.spawn(x=x, y=y, px=x, py=y)
+            self.goomba_hash.insert(goomba, goomba.x, goomba.y, goomba.width, goomba.height)
+        else:
+            self.goomba_pool.park_new(x=x, y=y, px=x, py=y)
+            
+    def active_region(self):
+        # Level x range whose entities are simulated
+        margin = self.active_margin
+        return self.camera_x - margin, self.camera_x + SCREEN_WIDTH + margin
+        
+    def is_active(self, x, width):
+        if self.active_margin is None:
+            return True
+        left, right = self.active_region()
+        return left <= x + width and x <= right
+        
+    def schedule(self):
+        # Wake what the active region reached this tick; putting entities
+        # to sleep walks the live ones, so it only runs every SLEEP_INTERVAL ticks
+        if self.active_margin is None:
+            # Sleeping was switched off; bring back anything still parked
+            self.coin_pool.wake_all()
+            self.goomba_pool.wake_all()
+            return
+        left, right = self.active_region()
+        self.coin_pool.wake(left, right)
+        self.goomba_pool.wake(left, right)
+        if self.ticks % SLEEP_INTERVAL == 0:
+            self.coin_pool.sleep_outside(left, right)
+            self.goomba_pool.sleep_outside(left, right)
+        
+    def reset_mario(self):
+        self.mario.x = 100
+        self.mario.y = 300
+        self.mario.vel_x = 0
+        self.mario.vel_y = 0
+        self.camera_x = 0
+        
+    def step(self, inputs=NO_INPUT, n=1):
+        # Advance up to n ticks holding the same input, stopping early once
+        # the level is over
+        for _ in range(n):
+            if self.status != "playing":
+                break
+            self.tick(inputs)
+        return self.status
+        
+    def remember_positions(self):
+        # Positions drawing interpolates from; set at the start of each tick
+        # and after jumps that should not be smoothed over
+        mario = self.mario
+        mario.prev_x = mario.x
+        mario.prev_y = mario.y
+        self.prev_camera_x = self.camera_x
+        goombas = self.goombas
+        goombas.column("px")[:] = goombas.column("x")
+        goombas.column("py")[:] = goombas.column("y")
+        
+    def view_x(self, alpha=1.0):
+        # Camera position a fraction alpha of the way through the last tick
+        return self.camera_x - (self.camera_x - self.prev_camera_x) * (1 - alpha)
+        
+    def tick(self, inputs):
+        profiler = self.profiler
+        self.remember_positions()
+        
+        # Update Mario with camera position for proper collision detection
+        self.mario.update(inputs, self.terrain, self.camera_x, self.dt)
+        if profiler is not None:
+            profiler.lap("mario")
+        
+        if self.batched(self.level_coins):
+            batch.update_coins(self.level_coins, self.dt)
+        else:
+            for coin in self.level_coins:
+                coin.update(self.dt)
+            
+        if self.batched(self.goombas):
+            batch.update_goombas(self.goombas, self.terrain, self.goomba_hash, self.dt)
+        else:
+            for goomba in self.goombas:
+                if goomba.alive:
+                    goomba.update(self.terrain, self.camera_x, self.dt)
+                    self.goomba_hash.move(goomba, goomba.x, goomba.y, goomba.width, goomba.height)
+        if profiler is not None:
+            profiler.lap("entities")
+                
+        self.handle_collisions()
+        if profiler is not None:
+            profiler.lap("collisions")
+        self.update_camera()
+        self.level_data.stream(self)
+        self.schedule()
+        self.ticks += 1
+        
+        # Update timer
+        self.time_left -= 1/self.tick_rate
+        if self.time_left <= 0:
+            self.time_left = 0
+            # Time's up - lose a life
+            self.lives -= 1
+            if self.lives <= 0:
+                self.status = "game_over"
+                self.lives = 3
+            else:
+                # Reset level
+                self.setup_level()
+        
+        # Check if level is complete (simple condition: reach far right)
+        finish_x = self.level_data.finish_x
+        if finish_x is not None and self.mario.x > finish_x:
+            self.status = "complete"
+            self.score += 1000  # Bonus for completing level
+        if profiler is not None:
+            profiler.lap("camera")
+            
+    def batched(self, store):
+        threshold = self.batch_threshold
+        return threshold is not None and len(store) >= threshold and batch.available()
+        
+    def handle_collisions(self):
+        # Mario's box is swept from where the tick started, so coins and
+        # Goombas he passes within one tick count at any tick rate
+        mario = self.mario
+        x, y, width, height = mario.prev_x, mario.prev_y, mario.width, mario.height
+        dx = mario.x - x
+        dy = mario.y - y
+        left = min(x, mario.x)
+        top = min(y, mario.y)
+        
+        # Coin collisions
+        for coin in self.coin_hash.query(left, top, width + abs(dx), height + abs(dy)):
+            if not coin.collected:
+                if sweep_overlaps(x, y, width, height, dx, dy, coin.x, coin.y, coin.width, coin.height):
+                    self.coin_hash.remove(coin)
+                    self.level_coins.remove(coin)
+                    self.score += 100
+                    self.coins += 1
+                    if self.coins >= 100:
+                        self.coins = 0
+                        self.lives += 1
+                    
+        # Goomba collisions, against the Goomba's own step; the grid holds
+        # where they ended up, so look as far around as one can walk or fall
+        reach = 5 * self.dt
+        for goomba in self.goomba_hash.query(left - reach, top - reach, width + abs(dx) + 2 * reach,
+                                             height + abs(dy) + 2 * reach):
+            if goomba.alive:
+                gx, gy = goomba.px, goomba.py
+                if sweep_overlaps(x, y, width, height, dx - (goomba.x - gx), dy - (goomba.y - gy),
+                                  gx, gy, goomba.width, goomba.height):
+                    if y + height <= gy:  # Mario was above the Goomba, so he fell onto it
+                        self.goomba_hash.remove(goomba)
+                        self.goombas.remove(goomba)
+                        mario.vel_y = -8  # Bounce off
+                        self.score += 200
+                    else:
+                        if self.mario.power_up_state > 0:
+                            self.mario.power_up_state -= 1
+                            # Brief invincibility would be good here
+                        else:
+                            self.lives -= 1
+                            # Reset Mario position
+                            self.mario.x = 100
+                            self.mario.y = 300
+                            self.camera_x = 0
+                            self.remember_positions()
+                            if self.lives <= 0:
+                                self.status = "game_over"
+                                self.lives = 3  # Reset lives
+                                self.score = max(0, self.score - 1000)  # Penalty for game over
+        
+    def update_camera(self):
+        # Camera follows Mario but doesn't go beyond level boundaries
+        target_x = self.mario.x - SCREEN_WIDTH // 2
+        
+        # Keep camera within level bounds
+        limit = self.level_data.camera_limit
+        if target_x < 0:
+            self.camera_x = 0
+        elif limit is not None and target_x > limit:  # Max camera position
+            self.camera_x = limit
+        else:
+            self.camera_x = target_x
@@ -0,0 +1,252 @@
+# Simulation snapshots and the rewind buffer.
+#
+# snapshot(sim) packs everything that changes while a level is played into
+# one bytes object: the counters, Mario, the coin and Goomba columns with
+# their broadphase order, the level's streaming position and, last, the
+# sleeping entities. restore(sim, data) puts a Simulation back into exactly
+# that state, so ticking on from a restored snapshot gives the same results
+# as the original run did. The level itself (platforms, spawn tables) is not
+# included: a snapshot can only be restored into a simulation playing the
+# level it was taken from.
+#
+# Entity columns are copied as raw array bytes, so a snapshot of a small
+# level takes a few microseconds; `python -m smbengine.bench snapshot`
+# measures it as the entity count grows.
+#
+# RewindBuffer keeps the most recent snapshots in one preallocated byte
+# buffer, dropping the oldest when it runs out of slots or bytes. The
+# sleeping entities are most of a snapshot in a big level but rarely change,
+# so it stores them only when a pool's version moves on, and every tick
+# after that points back at the same copy.
+
+import struct
+from array import array
+from collections import deque
+
+from smbengine.constants import FPS
+
+MAGIC = b"SMBSNP"
+VERSION = 2
+
+# magic, version, score, lives, coins, ticks, status, time left, camera x,
+# first chunk, next chunk, scroll
+HEADER = "<6sBiiiIBddqqd"
+# x, y, vel x, vel y, on ground, facing right, power-up state
+MARIO = "<ddddBBB"
+# live rows, broadphase next order
+STORE = "<Iq"
+
+STATUSES = ("playing", "complete", "game_over")
+
+
+def read_array(typecode, data):
+    # array(typecode, memoryview) would take the view as a sequence of ints
+    values = array(typecode)
+    values.frombytes(data)
+    return values
+
+
+def pack_store(out, store, grid):
+    handles = store.handles
+    entries = grid.entries
+    out.append(struct.pack(STORE, len(handles), grid.next_order))
+    out.extend(column.tobytes() for column in store.arrays)
+    out.append(array("q", [entries[handle][0] for handle in handles]).tobytes())
+
+
+def unpack_store(view, offset, store, grid):
+    count, next_order = struct.unpack_from(STORE, view, offset)
+    offset += struct.calcsize(STORE)
+    columns = []
+    for column in store.arrays:
+        size = count * column.itemsize
+        columns.append(view[offset:offset + size])
+        offset += size
+    orders = read_array("q", view[offset:offset + 8 * count])
+    offset += 8 * count
+
+    grid.clear()
+    for handle, order in zip(store.load(columns), orders):
+        grid.insert(handle, handle.x, handle.y, handle.width, handle.height, order)
+    grid.next_order = next_order
+    return offset
+
+
+def pack_pools(sim):
+    # The sleeping coins and Goombas, as they end a snapshot
+    return sim.coin_pool.pack() + sim.goomba_pool.pack()
+
+
+def pools_key(sim):
+    # Equal for two ticks exactly when pack_pools would give the same bytes
+    return sim.coin_pool, sim.coin_pool.version, sim.goomba_pool, sim.goomba_pool.version
+
+
+def snapshot(sim, pools=True):
+    # With pools=False the sleeping entities are left off the end, for
+    # callers that keep pack_pools(sim) themselves
+    mario = sim.mario
+    out = [
+        struct.pack(HEADER, MAGIC, VERSION, sim.score, sim.lives, sim.coins, sim.ticks,
+                    STATUSES.index(sim.status), sim.time_left, sim.camera_x, *sim.level_data.stream_state()),
+        struct.pack(MARIO, mario.x, mario.y, mario.vel_x, mario.vel_y, mario.on_ground, mario.facing_right,
+                    mario.power_up_state),
+    ]
+    pack_store(out, sim.level_coins, sim.coin_hash)
+    pack_store(out, sim.goombas, sim.goomba_hash)
+    if pools:
+        out.append(pack_pools(sim))
+    return b"".join(out)
+
+
+def restore(sim, data, pools=None):
+    # pools is the pack_pools bytes for a snapshot taken with pools=False
+    view = memoryview(data)
+    (magic, version, sim.score, sim.lives, sim.coins, sim.ticks, status, sim.time_left, sim.camera_x,
+     first, end, scroll) = struct.unpack_from(HEADER, view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a simulation snapshot of this version")
+    sim.status = STATUSES[status]
+    offset = struct.calcsize(HEADER)
+
+    mario = sim.mario
+    x, y, mario.vel_x, mario.vel_y, on_ground, facing_right, mario.power_up_state = struct.unpack_from(MARIO, view, offset)
+    mario.x = x
+    mario.y = y
+    mario.on_ground = bool(on_ground)
+    mario.facing_right = bool(facing_right)
+    offset += struct.calcsize(MARIO)
+
+    offset = unpack_store(view, offset, sim.level_coins, sim.coin_hash)
+    offset = unpack_store(view, offset, sim.goombas, sim.goomba_hash)
+    if pools is not None:
+        view = memoryview(pools)
+        offset = 0
+    offset = sim.coin_pool.load(view, offset)
+    sim.goomba_pool.load(view, offset)
+    sim.level_data.restore_stream(sim, (first, end, scroll))
+
+    # Drawing should jump straight to the restored state
+    sim.remember_positions()
+
+
+class RewindBuffer:
+    # The last `seconds` worth of snapshots, one per tick, stored back to
+    # back in a ring of `budget` bytes. A tick is stored as [start, size,
+    # pools entry]: its snapshot without the sleeping entities, and the
+    # entry holding those, [start, size, None, ticks pointing at it]
+    def __init__(self, seconds=10, rate=FPS, budget=32 << 20):
+        self.capacity = int(seconds * rate)
+        self.buffer = bytearray(budget)
+        self.records = deque()  # entries in ring order, oldest first
+        self.ticks = 0          # tick entries in records
+        self.pools = None       # the newest pools entry
+        self.key = None         # pools_key of the simulation it was packed from
+
+    def __len__(self):
+        return self.ticks
+
+    def clear(self):
+        self.records.clear()
+        self.ticks = 0
+        self.pools = None
+
+    def push(self, sim):
+        # Record the state sim is in now
+        data = snapshot(sim, pools=False)
+        key = pools_key(sim)
+        if self.pools is None or key != self.key:
+            pools = pack_pools(sim)
+            if 2 * (len(pools) + len(data)) > len(self.buffer):
+                # Too little room to keep even one tick, and the pools
+                # may have to move past it
+                self.clear()
+                return
+            self.pools = self.write(pools, [None, 0])
+            self.key = key
+        self.write(data, [self.pools])
+        self.pools[3] += 1
+        self.ticks += 1
+
+    def write(self, data, tail):
+        # Copy data into the ring after the newest entry, making room by
+        # dropping the oldest, and add it as [start, size, *tail]
+        records = self.records
+        size = len(data)
+        start = 0
+        while records:
+            if tail[0] is not None and self.ticks >= self.capacity:
+                self.drop_oldest_tick()
+                continue
+            last = records[-1]
+            start = last[0] + last[1]
+            if start + size > len(self.buffer):
+                if records[0][0] >= start:
+                    # Whatever is left past the end is the oldest
+                    self.drop_oldest()
+                    continue
+                start = 0
+            # Going round the ring from the write position reaches the
+            # oldest entries first
+            first = records[0]
+            if first[0] < start + size and first[0] + first[1] > start:
+                self.drop_oldest()
+                continue
+            break
+        self.buffer[start:start + size] = data
+        entry = [start, size, *tail]
+        records.append(entry)
+        return entry
+
+    def drop_oldest(self):
+        # Free the oldest entry's bytes
+        records = self.records
+        entry = records.popleft()
+        if entry[2] is not None:
+            self.ticks -= 1
+            entry[2][3] -= 1
+        elif entry is self.pools:
+            # The pools new ticks point at move to the newest end, keeping
+            # the same entry for the ticks already pointing at them
+            start, size = entry[:2]
+            moved = self.write(bytes(self.buffer[start:start + size]), [None, 0])
+            records.pop()
+            records.append(entry)
+            entry[0] = moved[0]
+        else:
+            # Older pools go with the ticks pointing at them, which are
+            # the oldest ones left and follow them directly
+            while records and records[0][2] is entry:
+                records.popleft()
+                self.ticks -= 1
+
+    def drop_oldest_tick(self):
+        # Drop one tick, for when there are `capacity` of them; pools in
+        # front of it stay until their bytes are needed
+        records = self.records
+        index = 0
+        while records[index][2] is None:
+            index += 1
+        entry = records[index]
+        del records[index]
+        self.ticks -= 1
+        entry[2][3] -= 1
+
+    def pop(self):
+        # The most recent snapshot, removed from the buffer, for restore();
+        # None when empty
+        records = self.records
+        if not self.ticks:
+            return None
+        index = len(records) - 1
+        while records[index][2] is None:
+            index -= 1
+        start, size, pools = records[index]
+        del records[index]
+        self.ticks -= 1
+        pools[3] -= 1
+        # Pools at the newest end that no tick points at any more
+        while records and records[-1][2] is None and not records[-1][3] and records[-1] is not self.pools:
+            records.pop()
+        buffer = self.buffer
+        return bytes(buffer[start:start + size]) + bytes(buffer[pools[0]:pools[0] + pools[1]])
@@ -0,0 +1,97 @@
+# Uniform-grid spatial hash used as the collision broadphase.
+#
+# Every object is registered with its bounding box and stored in each grid
+# cell that box overlaps. A query only visits the cells under the query box,
+# so a collision pass costs what is near the player rather than what is in
+# the level.
+
+
+class SpatialHash:
+    def __init__(self, cell_size=128):  # 4 x 32 px tiles per cell
+        self.cell_size = cell_size
+        self.cells = {}    # (cell_x, cell_y) -> {obj: order}
+        self.entries = {}  # obj -> (order, cell range)
+        self.next_order = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, obj):
+        return obj in self.entries
+
+    def cell_range(self, x, y, width, height):
+        # Same truncation pygame.Rect applies to float coordinates
+        x = int(x)
+        y = int(y)
+        size = self.cell_size
+        return (x // size, y // size,
+                (x + max(int(width), 1) - 1) // size,
+                (y + max(int(height), 1) - 1) // size)
+
+    def insert(self, obj, x, y, width, height, order=None):
+        # order is only given when restoring a saved grid
+        if obj in self.entries:
+            self.remove(obj)
+        if order is None:
+            order = self.next_order
+            self.next_order += 1
+        cell_range = self.cell_range(x, y, width, height)
+        self.entries[obj] = (order, cell_range)
+        self._add_to_cells(obj, order, cell_range)
+
+    def move(self, obj, x, y, width, height):
+        order, old_range = self.entries[obj]
+        new_range = self.cell_range(x, y, width, height)
+        # Most moves stay inside the same cells, so there is nothing to do
+        if new_range == old_range:
+            return
+        self._remove_from_cells(obj, old_range)
+        self.entries[obj] = (order, new_range)
+        self._add_to_cells(obj, order, new_range)
+
+    def remove(self, obj):
+        entry = self.entries.pop(obj, None)
+        if entry is not None:
+            self._remove_from_cells(obj, entry[1])
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.next_order = 0
+
+    def query(self, x, y, width, height):
+        # Objects whose cells overlap the box, in the order they were inserted
+        # so collision passes resolve exactly like a walk over the full list
+        cx0, cy0, cx1, cy1 = self.cell_range(x, y, width, height)
+        cells = self.cells
+        found = {}
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        if len(found) > 1:
+            return sorted(found, key=found.__getitem__)
+        return list(found)
+
+    def _add_to_cells(self, obj, order, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = {obj: order}
+                else:
+                    bucket[obj] = order
+
+    def _remove_from_cells(self, obj, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.pop(obj, None)
+                    if not bucket:
+                        del cells[(cx, cy)]
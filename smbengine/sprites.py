@@ -0,0 +1,106 @@
+# Sprite atlas for Mario, Goombas and coins.
+#
+# Every look an entity can have is drawn once into a single colour-keyed
+# atlas surface: small and super Mario facing either way, the Goomba, and
+# one coin frame per spin width. Coin.draw already truncates the spin width
+# to whole pixels, so the Coin.width + 1 frames cover every width it can
+# produce. Drawing an entity is then one blit of its frame, and a whole
+# level's worth of sprites can go through a single Surface.blits call.
+#
+# Atlases for a low-resolution framebuffer draw the same parts through
+# scale_rect rather than shrinking the full-size frames, so thin coin frames
+# stay at least a pixel wide.
+
+import pygame
+
+from smbengine.constants import BLACK, COIN_YELLOW, MARIO_BLUE, MARIO_RED
+from smbengine.render import display_format, scale_point, scale_rect
+
+COLORKEY = (255, 0, 255)
+CELL_WIDTH = 40
+CELL_HEIGHT = 60
+
+GOOMBA_BROWN = (139, 69, 19)
+SKIN = (255, 220, 177)
+
+COIN_WIDTH = 16
+COIN_FRAMES = COIN_WIDTH + 1
+
+# Parts of each Mario facing right, relative to his position: the hat pokes
+# out above his 32x32 box and super Mario's overalls below it
+MARIO_PARTS = {
+    0: ((MARIO_RED, (8, 12, 16, 12)),   # Body
+        (MARIO_BLUE, (6, 16, 20, 16)),  # Overalls
+        (SKIN, (4, 0, 24, 16)),         # Face
+        (BLACK, (19, 5, 4, 4)),         # Eye
+        (MARIO_RED, (2, -4, 28, 8))),   # Hat
+    1: ((MARIO_RED, (6, 20, 20, 16)),
+        (MARIO_BLUE, (4, 24, 24, 20)),
+        (SKIN, (2, 4, 28, 20)),
+        (BLACK, (20, 9, 4, 4)),
+        (MARIO_RED, (0, 0, 32, 8))),
+}
+MARIO_TOP = -4
+MARIO_SIZE = (32, 48)
+
+atlases = {}  # render scale -> SpriteAtlas
+
+
+def draw_mario(surface, scale, power):
+    for color, (x, y, width, height) in MARIO_PARTS[power]:
+        pygame.draw.rect(surface, color, scale_rect((x, y - MARIO_TOP, width, height), scale))
+
+
+def draw_goomba(surface, scale):
+    surface.fill(GOOMBA_BROWN)
+    pygame.draw.rect(surface, BLACK, scale_rect((8, 8, 6, 6), scale))   # Left eye
+    pygame.draw.rect(surface, BLACK, scale_rect((18, 8, 6, 6), scale))  # Right eye
+
+
+def draw_coin(surface, scale, width):
+    if width > 0:
+        pygame.draw.ellipse(surface, COIN_YELLOW, scale_rect(((COIN_WIDTH - width) // 2, 0, width, COIN_WIDTH), scale))
+
+
+class SpriteAtlas:
+    def __init__(self, scale=1):
+        self.scale = scale
+        self.frames = {}  # key -> (area in the atlas, x offset, y offset)
+
+        # (key, size, offset, draw) for every frame; Mario's power states
+        # above 1 look like super Mario
+        looks = []
+        for power in (0, 1):
+            for facing_right in (True, False):
+                looks.append((("mario", power, facing_right), MARIO_SIZE, (0, MARIO_TOP),
+                              lambda surface, scale, power=power: draw_mario(surface, scale, power)))
+        looks.append((("goomba",), (32, 32), (0, 0), draw_goomba))
+        for width in range(COIN_FRAMES):
+            looks.append((("coin", width), (COIN_WIDTH, COIN_WIDTH), (0, 0),
+                          lambda surface, scale, width=width: draw_coin(surface, scale, width)))
+
+        atlas = pygame.Surface((CELL_WIDTH * len(looks) // scale, CELL_HEIGHT // scale))
+        atlas.fill(COLORKEY)
+        for cell, (key, size, (dx, dy), draw) in enumerate(looks):
+            frame = pygame.Surface((-(-size[0] // scale), -(-size[1] // scale)))
+            frame.fill(COLORKEY)
+            draw(frame, scale)
+            if key[0] == "mario" and not key[2]:
+                frame = pygame.transform.flip(frame, True, False)
+            area = atlas.blit(frame, (cell * CELL_WIDTH // scale, 0))
+            self.frames[key] = (area, dx, dy)
+        atlas = display_format(atlas)
+        atlas.set_colorkey(COLORKEY)  # no RLEACCEL: RLE blits of a sub-area walk whole atlas rows
+        self.surface = atlas
+
+    def sprite(self, key, x, y):
+        # (surface, position, area) for blit or blits, with x and y in window pixels
+        area, dx, dy = self.frames[key]
+        return self.surface, scale_point(x + dx, y + dy, self.scale), area
+
+
+def sprite_atlas(scale=1):
+    atlas = atlases.get(scale)
+    if atlas is None:
+        atlas = atlases[scale] = SpriteAtlas(scale)
+    return atlas
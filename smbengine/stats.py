@@ -0,0 +1,27 @@
+# Summary statistics for timing samples.
+
+import math
+
+
+def percentile(ordered, fraction):
+    # Nearest-rank percentile of an already sorted sequence: the smallest
+    # sample with at least that fraction of them at or below it. The rank
+    # is rounded first so e.g. 0.07 * 100 = 7.000000000000001 still means 7
+    if not ordered:
+        return 0.0
+    rank = math.ceil(round(fraction * len(ordered), 9))
+    index = min(len(ordered) - 1, max(0, rank - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    # p50/p95/p99/worst/mean of a list of durations, in the samples' units
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
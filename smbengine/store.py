@@ -0,0 +1,112 @@
+# Structure-of-arrays storage for coins and Goombas.
+#
+# Each entity kind keeps its fields in typed column arrays with one row per
+# live entity. Entities are reached through small __slots__ handles whose
+# attributes read and write their row. Removing an entity moves the last row
+# into the hole, so the columns stay dense and loops only ever see live
+# entities. Removed handles go to a pool and are reused by the next spawn.
+
+from array import array
+
+
+def _column_property(index):
+    def get(self):
+        return self.store.arrays[index][self.row]
+
+    def set(self, value):
+        self.store.arrays[index][self.row] = value
+
+    return property(get, set)
+
+
+class EntityHandle:
+    __slots__ = ("store", "row")
+    columns = ()  # (name, typecode, default) for each stored field
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for index, (name, typecode, default) in enumerate(cls.columns):
+            setattr(cls, name, _column_property(index))
+
+    @property
+    def live(self):
+        # False once removed from its store
+        return self.row >= 0
+
+
+class EntityStore:
+    def __init__(self, handle_cls):
+        self.handle_cls = handle_cls
+        self.names = [name for name, typecode, default in handle_cls.columns]
+        self.defaults = [default for name, typecode, default in handle_cls.columns]
+        self.arrays = [array(typecode) for name, typecode, default in handle_cls.columns]
+        self.handles = []  # row -> handle
+        self.pool = []     # removed handles waiting to be reused
+
+    def __len__(self):
+        return len(self.handles)
+
+    def __iter__(self):
+        # Iterate over a copy so entities can be removed along the way
+        return iter(self.handles[:])
+
+    def column(self, name):
+        return self.arrays[self.names.index(name)]
+
+    def spawn(self, **values):
+        handle = self._new_handle()
+        for name, default, column in zip(self.names, self.defaults, self.arrays):
+            column.append(values.get(name, default))
+        self.handles.append(handle)
+        return handle
+
+    def _new_handle(self):
+        if self.pool:
+            handle = self.pool.pop()
+        else:
+            handle = self.handle_cls.__new__(self.handle_cls)
+            handle.store = self
+        handle.row = len(self.handles)
+        return handle
+
+    def values(self, handle):
+        # The handle's row in column order, as spawn_values takes it
+        row = handle.row
+        return tuple(column[row] for column in self.arrays)
+
+    def spawn_values(self, values):
+        return self.spawn(**dict(zip(self.names, values)))
+
+    def remove(self, handle):
+        # Swap-remove: the last row fills the hole left by this one
+        row = handle.row
+        if row < 0:
+            return
+        last = len(self.handles) - 1
+        for column in self.arrays:
+            column[row] = column[last]
+            column.pop()
+        moved = self.handles.pop()
+        if moved is not handle:
+            self.handles[row] = moved
+            moved.row = row
+        handle.row = -1
+        self.pool.append(handle)
+
+    def load(self, columns):
+        # Replace every row with the ones in `columns`, one buffer per
+        # column as array.tobytes() gives them; returns the handles in row order
+        self.clear()
+        for column, data in zip(self.arrays, columns):
+            column.frombytes(data)
+        for _ in range(len(self.arrays[0])):
+            self.handles.append(self._new_handle())
+        return self.handles
+
+    def clear(self):
+        for handle in self.handles:
+            handle.row = -1
+        self.pool.extend(self.handles)
+        self.handles.clear()
+        for column in self.arrays:
+            del column[:]
@@ -0,0 +1,24 @@
+# Cache of rendered text surfaces.
+#
+# font.render is one of the slower calls in a frame and the HUD asks for the
+# same handful of strings over and over, so rendered surfaces are kept in an
+# LRU keyed by (font, text, colour).
+
+from smbengine.cache import LRUCache
+
+
+class TextCache:
+    def __init__(self, capacity=128):
+        self.surfaces = LRUCache(capacity)
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, antialias, color)
+            self.surfaces.put(key, surface)
+        return surface
+
+
+# Shared by every HUD and screen; fonts are built once by their owners
+text_cache = TextCache()
@@ -0,0 +1,92 @@
+# Tile-grid terrain layer.
+#
+# Static platforms are rasterised into a 2D grid of TILE_SIZE tiles held in
+# one flat uint16 array. Each tile stores a slot id naming the platforms that
+# cover it, so a collision lookup reads only the handful of tiles under the
+# box being tested and the cost no longer depends on the length of the level.
+# Platforms keep their exact rectangles, which means levels that are not
+# aligned to the tile grid collide exactly as they did before.
+
+from array import array
+
+
+class TileGrid:
+    def __init__(self, width, height, tile_size, origin=0):
+        self.width = width    # in tiles
+        self.height = height  # in tiles
+        self.tile_size = tile_size
+        self.origin = origin  # level x of the grid's left edge, a multiple of tile_size
+        self.cells = array("H", bytes(2 * width * height))
+        self.slots = [()]      # slot id -> platform indices, slot 0 is empty
+        self.slot_ids = {(): 0}
+        self.platforms = []
+
+    @classmethod
+    def from_platforms(cls, platforms, tile_size, origin=0):
+        right = max((p.x + p.width - origin for p in platforms), default=0)
+        bottom = max((p.y + p.height for p in platforms), default=0)
+        grid = cls(-(-int(right) // tile_size), -(-int(bottom) // tile_size), tile_size, origin)
+        for platform in platforms:
+            grid.add(platform)
+        return grid
+
+    @classmethod
+    def from_index(cls, width, height, tile_size, cells, slots, platforms, origin=0):
+        # A grid over an already built collision index, such as the views
+        # into a compiled level file; platforms cannot be added to it
+        grid = cls.__new__(cls)
+        grid.width = width
+        grid.height = height
+        grid.tile_size = tile_size
+        grid.origin = origin
+        grid.cells = cells
+        grid.slots = slots
+        grid.slot_ids = None
+        grid.platforms = platforms
+        return grid
+
+    def add(self, platform):
+        index = len(self.platforms)
+        self.platforms.append(platform)
+        tx0, ty0, tx1, ty1 = self.tile_range(platform.x, platform.y, platform.width, platform.height)
+        cells = self.cells
+        for ty in range(ty0, ty1 + 1):
+            row = ty * self.width
+            for tx in range(tx0, tx1 + 1):
+                cells[row + tx] = self._slot_for(self.slots[cells[row + tx]] + (index,))
+
+    def tile_range(self, x, y, width, height):
+        # Tiles overlapped by the box, clipped to the grid; empty when
+        # tx0 > tx1 or ty0 > ty1
+        size = self.tile_size
+        x = int(x) - self.origin
+        y = int(y)
+        return (max(x // size, 0), max(y // size, 0),
+                min((x + max(int(width), 1) - 1) // size, self.width - 1),
+                min((y + max(int(height), 1) - 1) // size, self.height - 1))
+
+    def query(self, x, y, width, height):
+        # Platforms covering any tile under the box, in the order they were
+        # added, matching SpatialHash.query
+        tx0, ty0, tx1, ty1 = self.tile_range(x, y, width, height)
+        cells = self.cells
+        slots = self.slots
+        found = set()
+        for ty in range(ty0, ty1 + 1):
+            row = ty * self.width
+            for tx in range(tx0, tx1 + 1):
+                slot = cells[row + tx]
+                if slot:
+                    found.update(slots[slot])
+        platforms = self.platforms
+        return [platforms[i] for i in sorted(found)]
+
+    def _slot_for(self, indices):
+        slot = self.slot_ids.get(indices)
+        if slot is None:
+            slot = len(self.slots)
+            if slot > 0xFFFF:
+                raise ValueError("too many distinct platform overlaps for a uint16 tile grid")
+            self.slots.append(indices)
+            self.slot_ids[indices] = slot
+        return slot
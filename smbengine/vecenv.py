@@ -0,0 +1,164 @@
+# Batched environment for training automated players.
+#
+# VecEnv holds N independent simulations of one level and advances all of
+# them with a single step(actions) call. Nothing is drawn unless render() is
+# asked for. Observations, rewards and done flags are written into
+# preallocated NumPy arrays that step() returns every time, so a training
+# loop can keep references to them. Unlike the rest of the engine this
+# module needs NumPy.
+#
+# An observation is a grid of cells centred on Mario with three channels:
+# solid terrain, Goombas and coins. An episode ends when the level is
+# completed, Mario loses a life or the tick limit is reached; finished
+# instances restart straight away, so the observation after a done is the
+# first one of the next episode.
+
+import numpy as np
+import pygame
+
+from smbengine.batch import column_view
+from smbengine.constants import SCREEN_HEIGHT, SCREEN_WIDTH, SKY_BLUE, TILE_SIZE
+from smbengine.controls import InputState
+from smbengine.levelfile import build_default_level
+from smbengine.sim import Simulation
+
+TERRAIN = 0
+GOOMBAS = 1
+COINS = 2
+
+DEATH_PENALTY = 1000
+
+# Stores at least this big are marked with array operations, smaller ones
+# with a plain loop
+MARK_BATCH = 32
+
+STATES = [InputState.from_bits(bits) for bits in range(8)]
+
+
+class VecEnv:
+    def __init__(self, n, level=None, cols=16, rows=12, cell=TILE_SIZE, max_ticks=3000):
+        self.level = level or build_default_level()
+        self.n = n
+        self.cols = cols
+        self.rows = rows
+        self.cell = cell
+        self.max_ticks = max_ticks
+
+        # Per-instance bookkeeping stays in plain lists: indexing NumPy
+        # arrays one element at a time is slower than the tick itself
+        self.sims = [None] * n
+        self.furthest = [0.0] * n  # best x of the current episode
+        self.last_score = [0] * n
+        self.episode_ticks = [0] * n
+
+        self.observations = np.zeros((n, 3, rows, cols), dtype=np.uint8)
+        self.rewards = np.zeros(n, dtype=np.float32)
+        self.dones = np.zeros(n, dtype=bool)
+
+        self.terrain = self.terrain_grid()
+        for i in range(n):
+            self.reset_one(i)
+
+    def terrain_grid(self):
+        # Solid cells of the whole level, padded by a view on every side so
+        # the window around Mario can always be sliced out
+        cell = self.cell
+        width = max(p.rect.right for p in self.level.platforms)
+        grid = np.zeros((self.rows * 2 + -(-SCREEN_HEIGHT // cell), self.cols * 2 + -(-width // cell)), dtype=np.uint8)
+        for platform in self.level.platforms:
+            rect = platform.rect
+            grid[self.rows + rect.top // cell:self.rows - (-rect.bottom // cell),
+                 self.cols + rect.left // cell:self.cols - (-rect.right // cell)] = 1
+        return grid
+
+    def reset(self):
+        for i in range(self.n):
+            self.reset_one(i)
+        self.rewards[:] = 0
+        self.dones[:] = False
+        return self.observations
+
+    def reset_one(self, i):
+        sim = Simulation(self.level)
+        self.sims[i] = sim
+        self.furthest[i] = sim.mario.x
+        self.last_score[i] = sim.score
+        self.episode_ticks[i] = 0
+        self.observe(i)
+
+    def step(self, actions):
+        # actions: one InputState bit mask (controls.LEFT | RIGHT | JUMP) per instance
+        rewards = self.rewards
+        dones = self.dones
+        for i, bits in enumerate(actions.tolist() if hasattr(actions, "tolist") else actions):
+            sim = self.sims[i]
+            lives = sim.lives
+            sim.tick(STATES[bits])
+            self.episode_ticks[i] += 1
+
+            # Score gained plus pixels of new ground covered
+            x = sim.mario.x
+            reward = sim.score - self.last_score[i]
+            if x > self.furthest[i]:
+                reward += x - self.furthest[i]
+                self.furthest[i] = x
+            self.last_score[i] = sim.score
+
+            lost_life = sim.lives < lives or sim.status == "game_over"
+            if lost_life:
+                reward -= DEATH_PENALTY
+            rewards[i] = reward
+
+            done = lost_life or sim.status != "playing" or self.episode_ticks[i] >= self.max_ticks
+            dones[i] = done
+            if done:
+                self.reset_one(i)
+            else:
+                self.observe(i)
+        return self.observations, rewards, dones
+
+    def observe(self, i):
+        sim = self.sims[i]
+        mario = sim.mario
+        cell = self.cell
+        cols = self.cols
+        rows = self.rows
+        obs = self.observations[i]
+
+        # Window origin in level cells, kept inside the padded terrain grid
+        col0 = min(max(int((mario.x + mario.width / 2) // cell) - cols // 2, -cols), self.terrain.shape[1] - 2 * cols)
+        row0 = min(max(int((mario.y + mario.height / 2) // cell) - rows // 2, -rows), self.terrain.shape[0] - 2 * rows)
+        obs[TERRAIN] = self.terrain[row0 + rows:row0 + 2 * rows, col0 + cols:col0 + 2 * cols]
+
+        # Each entity marks the cell under its centre
+        obs[GOOMBAS] = 0
+        obs[COINS] = 0
+        for channel, store in ((GOOMBAS, sim.goombas), (COINS, sim.level_coins)):
+            kind = store.handle_cls
+            if len(store) < MARK_BATCH:
+                grid = obs[channel]
+                for x, y in zip(store.column("x"), store.column("y")):
+                    c = int((x + kind.width / 2) // cell) - col0
+                    r = int((y + kind.height / 2) // cell) - row0
+                    if 0 <= c < cols and 0 <= r < rows:
+                        grid[r, c] = 1
+            else:
+                c = ((column_view(store, "x") + kind.width / 2) // cell).astype(np.int64) - col0
+                r = ((column_view(store, "y") + kind.height / 2) // cell).astype(np.int64) - row0
+                inside = (c >= 0) & (c < cols) & (r >= 0) & (r < rows)
+                obs[channel, r[inside], c[inside]] = 1
+
+    def render(self, i=0, surface=None):
+        # Draw instance i the way the game shows a level, minus the HUD
+        if surface is None:
+            surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        sim = self.sims[i]
+        surface.fill(SKY_BLUE)
+        for platform in sim.platforms:
+            platform.draw(surface, sim.camera_x)
+        for coin in sim.level_coins:
+            coin.draw(surface, sim.camera_x)
+        for goomba in sim.goombas:
+            goomba.draw(surface, sim.camera_x)
+        sim.mario.draw(surface, sim.camera_x)
+        return surface